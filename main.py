@@ -1,37 +1,69 @@
 from reisp.parser.parser import Parser
-from reisp.env.env import Env
+from reisp.buffer.file_buffer import FileBuffer
+from reisp.parser.parallel import parse_parallel
+from reisp.compiler import closure
+from reisp.compiler.fold import fold
+from reisp.types.check import check
+from reisp.vm import machine
+from reisp.cache.ast_cache import cache_path, source_digest, load_cache, CacheWriter
+from reisp.env.slot_env import SlotEnv
+from reisp.env.tracking_env import TrackingEnv
+from reisp.env.session import Session
+from reisp.env.resolve import resolve
 from reisp.std.register import register_exports
 from reisp.loc import Loc
-from sys import stderr
+from sys import stderr, exit
 from argparse import ArgumentParser
 
 class ReplBuffer:
     def __init__(self):
         self.lines = []
+        # Line number of the first line still in `self.lines`
+        self.first = 0
         self.loc = Loc(-1, -1)
         self.skip = False
 
+    def current_line(self):
+        return self.lines[self.loc.line - self.first]
+
     def is_eol(self):
         if not self.lines:
             return True
-        return not self.lines[self.loc.line][self.loc.col+1:].strip()
+        return not self.current_line()[self.loc.col+1:].strip()
 
     def skip_line(self):
         self.skip = True
 
     def get_line(self, linenr):
-        return self.lines[linenr]
+        return self.lines[linenr - self.first]
+
+    def release(self, linenr):
+        """
+        Forgets the lines before `linenr`, which no error can point
+        into anymore. The current line is always kept.
+        """
+        count = min(linenr, self.loc.line) - self.first
+        if count > 0:
+            del self.lines[:count]
+            self.first += count
 
     def __next__(self):
         self.loc.col += 1
-        if self.skip or not self.lines or self.loc.col >= len(self.lines[self.loc.line]):
+        if self.skip or not self.lines or self.loc.col >= len(self.current_line()):
             self.lines.append(input("> ") + "\n")
             self.loc.line += 1
             self.loc.col = 0
             self.skip = False
-        char = self.lines[self.loc.line][self.loc.col]
+        char = self.current_line()[self.loc.col]
         return char
 
+# Ways of evaluating a top-level form against an environment
+engines = {
+    "tree": lambda node, env: resolve(node).eval(env),
+    "closure": closure.evaluate,
+    "vm": machine.evaluate
+}
+
 # TODO: Might want to change this depending on whether the terminal
 # supports colors or not
 RED = "\x01\033[31m\x02"
@@ -44,15 +76,52 @@ def show_err(buffer, loc, message):
     # string to be highlighted
     stderr.write(f"{loc.show()}{message}\n")
     line = buffer.get_line(loc.line)
-    stderr.write(f"    {line[:loc.col]}{RED}{line[loc.col]}{RESET}{line[loc.col + 1:]}")
+    stderr.write(f"    {line[:loc.col]}{RED}{line[loc.col:loc.col + 1]}{RESET}{line[loc.col + 1:]}")
     stderr.write(f"    {' ' * loc.col}{BLUE}^{RESET}\n")
 
-def run_file(f):
-    pass
+def evaluate_form(evaluate, node, env):
+    if (node := check(fold(node, env), env)).is_err():
+        return node
+    return evaluate(node, env)
+
+def run_file(f, use_cache=True, jobs=1, engine="tree"):
+    evaluate = engines[engine]
+    env = SlotEnv()
+    register_exports(env)
+    with FileBuffer(f) as input_buffer:
+        forms = None
+        if use_cache:
+            digest = source_digest(input_buffer.data)
+            forms = load_cache(cache_path(f), digest)
+        # Forms are written to the cache as they are parsed, so that
+        # they don't have to be kept around
+        writer = CacheWriter(cache_path(f), digest) if use_cache and forms is None else None
+        if forms is None and jobs > 1:
+            forms = parse_parallel(str(input_buffer.data, "utf-8"), jobs)
+        elif forms is None:
+            forms = Parser(input_buffer).iter_forms()
+        try:
+            for node in forms:
+                if node.is_err():
+                    show_err(input_buffer, node.loc, node.show())
+                    return 1
+                if writer is not None:
+                    writer.add(node)
+                if (value := evaluate_form(evaluate, node, env)).is_err():
+                    show_err(input_buffer, value.loc, value.show())
+                    return 1
+            if writer is not None:
+                writer.commit()
+        finally:
+            if writer is not None:
+                writer.close()
+    return 0
 
-def run_repl():
-    env = Env()
+def run_repl(engine="tree", incremental=False):
+    evaluate = engines[engine]
+    env = TrackingEnv() if incremental else SlotEnv()
     register_exports(env)
+    session = Session(env, lambda node, env: evaluate_form(evaluate, node, env))
     input_buffer = ReplBuffer()
     parser = Parser(input_buffer)
     while True:
@@ -65,21 +134,36 @@ def run_repl():
                 show_err(input_buffer, input_buffer.loc, "Unexpected text after expression")
                 parser.skip_line()
                 continue
-            if (value := node.eval(env)).is_err():
+            if incremental:
+                value = session.run(node)
+            else:
+                value = evaluate_form(evaluate, node, env)
+            if value.is_err():
                 show_err(input_buffer, value.loc, value.show())
                 continue
+            # The lines of the forms run again may be gone, so their
+            # errors are shown without them
+            for form in session.rerun:
+                print(f"{form.node.show()} => {form.value.show()}")
             parser.restore = []
+            input_buffer.release(input_buffer.loc.line)
             print(value.show())
         except EOFError:
             stderr.write("\nExiting...\n")
             break
 
-arg_parser = ArgumentParser(prog="reisp", description="A statically typed, interpreted, custom flavor of Lisp")
-arg_parser.add_argument("file", nargs="?")
+if __name__ == "__main__":
+    arg_parser = ArgumentParser(prog="reisp", description="A statically typed, interpreted, custom flavor of Lisp")
+    arg_parser.add_argument("file", nargs="?")
+    arg_parser.add_argument("--no-cache", action="store_true", help="do not read or write a .reispc parse cache")
+    arg_parser.add_argument("--jobs", type=int, default=1, help="number of processes to parse the file with")
+    arg_parser.add_argument("--engine", choices=engines, default="tree", help="how to evaluate the program")
+    arg_parser.add_argument("--incremental", action="store_true",
+                            help="let the REPL redefine names and rerun the forms depending on them")
 
-args = arg_parser.parse_args()
+    args = arg_parser.parse_args()
 
-if args.file:
-    run_file(args.file)
-else:
-    run_repl()
+    if args.file:
+        exit(run_file(args.file, use_cache=not args.no_cache, jobs=args.jobs, engine=args.engine))
+    else:
+        run_repl(engine=args.engine, incremental=args.incremental)
@@ -1,12 +1,22 @@
 from reisp.loc import Loc
-from reisp.ast.node_err import NodeErr
+from reisp.ast.node_err import NodeErr, EvalError
 from reisp.types.type import BaseType, Type, resolve_type
+from reisp.env import watch
 from typing import Callable, List as TList
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 @dataclass
 class BaseNode:
     loc: Loc
+    # What is worked out about a node once it is the body of a function,
+    # kept on the node so that it goes away along with it. These aren't
+    # dataclass fields, so they are not compared or copied.
+    # The free names, see `reisp.env.resolve.free_names`
+    free_names = None
+    # The compiled closure, see `reisp.compiler.closure.compile_body`
+    closure_code = None
+    # The bytecode, see `reisp.vm.machine.body_code`
+    vm_code = None
 
     def is_err(self):
         return False
@@ -14,6 +24,23 @@ class BaseNode:
     def is_callable(self):
         return False
 
+    def eval_tail(self, env):
+        """
+        Evaluates a node in tail position. This is the same as `eval`,
+        except that a call to a user function is not made but returned
+        as a `TailCall`, for the function the node is the body of to
+        make in place of its own frame.
+        """
+        return self.eval(env)
+
+@dataclass
+class TailCall:
+    func: 'Node.UserFunc'
+    values: TList[BaseNode]
+
+    def is_err(self):
+        return False
+
 class Node:
     class Nil(BaseNode):
         def type(self):
@@ -102,6 +129,90 @@ class Node:
         def show(self):
             return self.value
 
+    @dataclass
+    class Local(BaseNode):
+        # An identifier bound by an enclosing `let` or `lambda` parameter
+        # of the same function, addressed by how many frames up it is
+        # and its slot in that frame. See `reisp.env.resolve`.
+        value: str
+        depth: int
+        slot: int
+
+        def type(self):
+            return Type.Sym()
+
+        def eval(self, env):
+            if (result := env.get_slot(self.depth, self.slot, self.value)) is None:
+                return NodeErr.IdentNotFound(self.loc, self.value)
+            return result
+
+        def show(self):
+            return self.value
+
+    @dataclass
+    class Folded(BaseNode):
+        # The value of `original` worked out ahead of time, which only
+        # holds while each name in `deps` still refers to the builtin
+        # paired with it. See `reisp.compiler.fold`.
+        value: BaseNode
+        deps: tuple
+        original: BaseNode
+
+        def type(self):
+            return self.value.type()
+
+        def eval(self, env):
+            for name, builtin in self.deps:
+                if env.get(name) is not builtin:
+                    return self.original.eval(env)
+            return self.value
+
+        def show(self):
+            return self.original.show()
+
+    @dataclass
+    class Checked(BaseNode):
+        # A call to an operator whose operands `reisp.types.check` found
+        # to be ints or bools, of type `proven`. `op` computes the result
+        # from the plain values of the operands, and operands that are
+        # checked calls themselves give theirs without being put in a
+        # node. This only holds while each name in `deps` still refers
+        # to the builtin paired with it.
+        proven: BaseType
+        deps: tuple
+        original: BaseNode
+        op: Callable = field(compare=False, repr=False)
+
+        def type(self):
+            return self.proven
+
+        def plain(self, env):
+            # Raises the errors it runs into as `EvalError`
+            values = []
+            for arg in self.original.values[1:]:
+                if isinstance(arg, Node.Checked):
+                    values.append(arg.plain(env))
+                elif (value := arg.eval(env)).is_err():
+                    raise EvalError(value)
+                else:
+                    values.append(value.value)
+            return self.op(*values)
+
+        def eval(self, env):
+            for name, builtin in self.deps:
+                if env.get(name) is not builtin:
+                    return self.original.eval(env)
+            try:
+                value = self.plain(env)
+            except EvalError as e:
+                return e.err
+            if isinstance(self.proven, Type.Int):
+                return Node.Int(self.loc, value)
+            return Node.Bool(self.loc, value)
+
+        def show(self):
+            return self.original.show()
+
     @dataclass
     class Quote(BaseNode):
         value: BaseNode
@@ -122,24 +233,60 @@ class Node:
     @dataclass
     class List(BaseNode):
         values: TList[BaseNode]
+        # The inline cache of the function the head resolved to, valid
+        # while the version is current and for the same environment
+        cache_version: int = field(default=-1, init=False, compare=False, repr=False)
+        cache_env: object = field(default=None, init=False, compare=False, repr=False)
+        cache_func: BaseNode = field(default=None, init=False, compare=False, repr=False)
 
         def type(self):
             return Type.List(resolve_type(self.values))
 
+        def callee(self, env):
+            """
+            Returns the function to call, or an error. When the head is a
+            name bound to a global function, the function is cached here
+            so that later calls skip looking it up.
+
+            Note: only global bindings are cached, since the caches are
+            only invalidated when a watched name is bound again and not
+            when a frame is popped. Popping a frame never uncovers a
+            global that was cached past it, as the binding that hid it
+            invalidated every cache when it was added.
+            """
+            if self.cache_version == watch.version and self.cache_env is env:
+                return self.cache_func
+            head = self.values[0]
+            if (func := head.eval(env)).is_err():
+                return func
+            elif not func.is_callable():
+                return NodeErr.NotCallable(head.loc, func)
+            if isinstance(head, Node.Ident) and env.get_global(head.value) is func:
+                watch.watch(head.value)
+                self.cache_version = watch.version
+                self.cache_env = env
+                self.cache_func = func
+            return func
+
         def eval(self, env):
             if len(self.values) == 0:
                 return self
-            if (func := self.values[0].eval(env)).is_err():
+            if (func := self.callee(env)).is_err():
                 return func
-            elif not func.is_callable():
-                return NodeErr.NotCallable(self.values[0].loc, func)
-            if isinstance(func, Node.BuiltinFunc):
-                result = func.call(self, env, self.values[1:])
-            else:
-                env.push()
-                result = func.call(self, env, self.values[1:])
-                env.pop()
-            return result
+            return func.call(self, env, self.values[1:])
+
+        def eval_tail(self, env):
+            if len(self.values) == 0:
+                return self
+            if (func := self.callee(env)).is_err():
+                return func
+            elif isinstance(func, Node.UserFunc) and func.memo is None:
+                if not isinstance(values := func.eval_args(self, env, self.values[1:]), list):
+                    return values
+                return TailCall(func, values)
+            elif func.tail is not None and len(self.values) - 1 == func.arity:
+                return func.tail(self, env, self.values[1:])
+            return func.call(self, env, self.values[1:])
 
         def show(self):
             result = "("
@@ -149,11 +296,44 @@ class Node:
                     result += " "
             return result + ")"
 
+    @dataclass(eq=False)
+    class Vector(BaseNode):
+        # A homogeneous vector of ints or bools, held in a NumPy array.
+        # Only made by the builtins in `reisp.std.vector`, which are
+        # only there if NumPy is installed. Ints that don't fit in an
+        # int64 are held as Python ints.
+        value: object
+
+        def type(self):
+            if self.value.dtype.kind == "b":
+                return Type.List(Type.Bool())
+            return Type.List(Type.Int())
+
+        def eval(self, env):
+            return self
+
+        def show(self):
+            if self.value.dtype.kind == "b":
+                return "[" + " ".join("true" if x else "false" for x in self.value.tolist()) + "]"
+            return "[" + " ".join(str(x) for x in self.value.tolist()) + "]"
+
+        def __eq__(self, other):
+            # NumPy is only imported once there are vectors to compare
+            from numpy import array_equal
+            # Vectors of ints hold them either as int64 or as Python
+            # ints, but never bools
+            return (isinstance(other, Node.Vector) and self.loc == other.loc
+                    and (self.value.dtype.kind == "b") == (other.value.dtype.kind == "b")
+                    and self.value.shape == other.value.shape and array_equal(self.value, other.value))
+
     @dataclass
     class BuiltinFunc(BaseNode):
         name: str
         arity: int
         func: Callable
+        # How the builtin is evaluated in tail position, if it evaluates
+        # any of its arguments there. See `reisp.std.util.tail_func`.
+        tail: Callable = None
 
         def is_callable(self):
             return True
@@ -177,19 +357,64 @@ class Node:
         name: str
         args: TList[str]
         body: BaseNode
+        # The `reisp.std.memo.Memo` caching the results, if memoized
+        memo: object = field(default=None, compare=False, repr=False)
+        # The variables captured where the function was made, and their
+        # values. See `reisp.std.func.make_lambda`.
+        free: TList[str] = field(default_factory=list)
+        captured: TList[BaseNode] = field(default_factory=list)
 
         def is_callable(self):
             return True
 
-        def call(self, source, env, args):
+        def eval_args(self, source, env, args):
+            # Returns the list of argument values, or an error
             if len(args) != len(self.args):
-                return NodeErr(NodeErrType.InvalidArgsNum, source)
-            for i, arg in enumerate(self.args):
-                if (value := args[i].eval(env)).is_err():
+                return NodeErr.InvalidArgsNum(source.values[0].loc, len(args), len(self.args))
+            values = []
+            for arg in args:
+                if (value := arg.eval(env)).is_err():
                     return value
-                env.add(arg, value)
-            result = self.body.eval(env)
-            return result
+                values.append(value)
+            return values
+
+        def call(self, source, env, args):
+            """
+            Calls the function. Calls in tail position of the body come
+            back as a `TailCall` and are made here in turn, so that a
+            loop written as tail recursion runs in constant stack.
+
+            Note: scoping is dynamic, so the function called in tail
+            position still sees what the caller bound. Its parameters
+            are bound on top of the caller's frames, merged into one
+            by `Env.rebind`, which keeps the stack of frames constant.
+            """
+            if not isinstance(values := self.eval_args(source, env, args), list):
+                return values
+            if self.memo is not None:
+                return self.memo.call(values, lambda: self.call_values(env, values))
+            return self.call_values(env, values)
+
+        def bind(self, env, depth, values):
+            """
+            Binds the parameters to `values` and the captured variables to
+            their values, in one frame in place of those above `depth`.
+            """
+            if self.free:
+                env.rebind(depth, self.args + self.free, values + self.captured)
+            else:
+                env.rebind(depth, self.args, values)
+
+        def call_values(self, env, values):
+            mark = env.depth()
+            func = self
+            while True:
+                func.bind(env, mark, values)
+                result = func.body.eval_tail(env)
+                if not isinstance(result, TailCall):
+                    env.unwind(mark)
+                    return result
+                func, values = result.func, result.values
 
         def type(self):
             return Type.Func()
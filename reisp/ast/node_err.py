@@ -9,6 +9,15 @@ class BaseNodeErr:
     def is_err(self):
         return True
 
+class EvalError(Exception):
+    """
+    Carries a `NodeErr` up the Python stack, for evaluators and passes
+    that raise errors instead of returning them.
+    """
+    def __init__(self, err):
+        super().__init__(err.show())
+        self.err = err
+
 class NodeErr:
     @dataclass
     class ZeroDiv(BaseNodeErr):
@@ -36,6 +45,70 @@ class NodeErr:
         def show(self):
             return f"Cannot set variable '{self.name}' because it already exists"
 
+    @dataclass
+    class NotUserFunc(BaseNodeErr):
+        value: 'BaseNode'
+
+        def show(self):
+            return f"Expected a user function (got {self.value.show()})"
+
+    @dataclass
+    class NotMemoized(BaseNodeErr):
+        value: 'BaseNode'
+
+        def show(self):
+            return f"Expected a memoized function (got {self.value.show()})"
+
+    @dataclass
+    class InvalidLimit(BaseNodeErr):
+        value: 'BaseNode'
+
+        def show(self):
+            return f"Expected a non-negative int as the limit (got {self.value.show()})"
+
+    @dataclass
+    class NotVector(BaseNodeErr):
+        value: 'BaseNode'
+
+        def show(self):
+            return f"Expected a vector (got {self.value.show()})"
+
+    @dataclass
+    class MixedVector(BaseNodeErr):
+        value: 'BaseNode'
+
+        def show(self):
+            return f"A vector can only hold ints or only bools (got {self.value.show()})"
+
+    @dataclass
+    class LengthMismatch(BaseNodeErr):
+        left: int
+        right: int
+
+        def show(self):
+            return f"Vectors have different lengths ({self.left} and {self.right})"
+
+    @dataclass
+    class IndexOutOfRange(BaseNodeErr):
+        index: int
+        length: int
+
+        def show(self):
+            return f"Index {self.index} is out of range for a vector of length {self.length}"
+
+    @dataclass
+    class EmptyVector(BaseNodeErr):
+        def show(self):
+            return "Cannot reduce an empty vector"
+
+    @dataclass
+    class TypeMismatch(BaseNodeErr):
+        expected: 'BaseType'
+        got: 'BaseType'
+
+        def show(self):
+            return f"Expected a value of type {self.expected.show()} (got {self.got.show()})"
+
     @dataclass
     class InvalidArgsNum(BaseNodeErr):
         got: int
@@ -0,0 +1,96 @@
+from reisp.loc import Loc
+from array import array
+import codecs
+import mmap
+import os
+
+CHUNK_SIZE = 1 << 20
+
+class FileBuffer:
+    def __init__(self, path, chunk_size=CHUNK_SIZE):
+        """
+        A source for `Lexer` that reads a file through a read-only
+        memory map, decoding it as UTF-8 one chunk at a time. Only the
+        current chunk is ever held as a Python string.
+
+        Note: like other sources, `__next__` yields one character at a
+        time and updates `loc`. It returns None at the end of the file.
+        """
+        self.file = open(path, "rb")
+        if os.fstat(self.file.fileno()).st_size:
+            self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self.data = b""
+        self.chunk_size = chunk_size
+        self.decoder = codecs.getincrementaldecoder("utf-8")()
+        # Byte offset of the next chunk to decode
+        self.offset = 0
+        self.chunk = ""
+        self.index = -1
+        self.last = None
+        self.loc = Loc(0, -1)
+        # Byte offsets of the starts of the lines found so far by
+        # `get_line`
+        self.line_starts = array("Q", [0])
+
+    def close(self):
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def read_chunk(self):
+        while self.offset < len(self.data):
+            end = self.offset + self.chunk_size
+            piece = self.data[self.offset:end]
+            self.offset = min(end, len(self.data))
+            if (chunk := self.decoder.decode(piece, self.offset == len(self.data))):
+                self.chunk = chunk
+                self.index = 0
+                return True
+        return False
+
+    def __next__(self):
+        if self.last == "\n":
+            self.loc.line += 1
+            self.loc.col = 0
+        else:
+            self.loc.col += 1
+        self.index += 1
+        if self.index >= len(self.chunk) and not self.read_chunk():
+            self.index = len(self.chunk)
+            self.last = None
+            return None
+        self.last = self.chunk[self.index]
+        return self.last
+
+    def is_eol(self):
+        end = self.chunk.find("\n", self.index + 1)
+        if end != -1:
+            return not self.chunk[self.index + 1:end].strip()
+        if self.chunk[self.index + 1:].strip() or self.decoder.getstate()[0]:
+            return False
+        end = self.data.find(b"\n", self.offset)
+        if end == -1:
+            end = len(self.data)
+        return not self.data[self.offset:end].strip()
+
+    def skip_line(self):
+        while self.last != "\n" and next(self) is not None:
+            pass
+
+    def get_line(self, linenr):
+        while len(self.line_starts) <= linenr:
+            end = self.data.find(b"\n", self.line_starts[-1])
+            if end == -1:
+                return "\n"
+            self.line_starts.append(end + 1)
+        start = self.line_starts[linenr]
+        end = self.data.find(b"\n", start)
+        end = len(self.data) if end == -1 else end
+        return bytes(self.data[start:end]).decode("utf-8", "replace") + "\n"
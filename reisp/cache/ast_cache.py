@@ -0,0 +1,214 @@
+from reisp.loc import Loc
+from reisp.ast.node import Node
+from reisp.types.type import Type
+from reisp.symbol import symbol
+import hashlib
+import marshal
+import io
+import os
+import struct
+
+MAGIC = b"RSPC"
+# Bump this whenever the encoding below or the node classes change
+CACHE_VERSION = 2
+header = struct.Struct("<4sHH32s")
+# The number of forms encoded together in a cache file. The header is
+# followed by the batches, each marshalled on its own, and then None.
+BATCH_SIZE = 256
+
+node_tags = [Node.Nil, Node.Bool, Node.Int, Node.Str, Node.Ident, Node.Quote, Node.List, Node.Type]
+type_tags = [Type.Nil, Type.Type, Type.Bool, Type.Int, Type.Str, Type.Sym, Type.Func, Type.Any,
+             Type.Quote, Type.List, Type.Infer, Type.Union]
+NIL, BOOL, INT, STR, IDENT, QUOTE, LIST, TYPE = range(len(node_tags))
+# Type tags follow the node tags so that both fit in one stream
+T_QUOTE, T_LIST, T_INFER, T_UNION = (len(node_tags) + type_tags.index(cls)
+                                     for cls in [Type.Quote, Type.List, Type.Infer, Type.Union])
+node_codes = {cls: i for i, cls in enumerate(node_tags)}
+type_codes = {cls: len(node_tags) + i for i, cls in enumerate(type_tags)}
+
+def cache_path(path):
+    # The suffix is added rather than replacing the extension, so that
+    # the cache of a file can never be the file itself
+    return path + ".reispc"
+
+def source_digest(data):
+    return hashlib.sha256(data).digest()
+
+def encode_type(_type, out):
+    code = type_codes[type(_type)]
+    if code == T_QUOTE or code == T_LIST:
+        encode_type(_type.subtype, out)
+    elif code == T_UNION:
+        encode_type(_type.left, out)
+        encode_type(_type.right, out)
+    out.append(code)
+    if code == T_INFER:
+        out.append(_type.name)
+
+def encode(nodes):
+    """
+    Flattens `nodes` into a list of entries in postorder, so that
+    `decode` can rebuild them with a stack instead of recursion. Each
+    entry is a tag followed by a fixed number of fields for that tag.
+    """
+    out = []
+    stack = [(node, False) for node in reversed(nodes)]
+    while stack:
+        node, visited = stack.pop()
+        if isinstance(node, (Node.Folded, Node.Checked)):
+            # Folding and checking depend on the environment, so only
+            # the form it came from is kept
+            node = node.original
+        code = node_codes[type(node)]
+        if not visited and code == LIST:
+            stack.append((node, True))
+            stack.extend((value, False) for value in reversed(node.values))
+            continue
+        elif not visited and code == QUOTE:
+            stack.append((node, True))
+            stack.append((node.value, False))
+            continue
+        elif code == TYPE:
+            encode_type(node.value, out)
+        out.append(code)
+        out.append(node.loc.line)
+        out.append(node.loc.col)
+        if code == LIST:
+            out.append(len(node.values))
+        elif code != NIL and code != QUOTE and code != TYPE:
+            out.append(node.value)
+    return out
+
+def decode(items):
+    """
+    Rebuilds the list of nodes flattened by `encode`.
+    """
+    nodes = []
+    types = []
+    items = iter(items)
+    for code in items:
+        if code >= len(node_tags):
+            if code == T_QUOTE or code == T_LIST:
+                types.append(type_tags[code - len(node_tags)](types.pop()))
+            elif code == T_UNION:
+                right = types.pop()
+                types.append(Type.Union(types.pop(), right))
+            elif code == T_INFER:
+                types.append(Type.Infer(next(items)))
+            else:
+                types.append(type_tags[code - len(node_tags)]())
+            continue
+        loc = Loc(next(items), next(items))
+        if code == NIL:
+            nodes.append(Node.Nil(loc))
+        elif code == QUOTE:
+            nodes.append(Node.Quote(loc, nodes.pop()))
+        elif code == TYPE:
+            nodes.append(Node.Type(loc, types.pop()))
+        elif code == LIST:
+            count = next(items)
+            values = nodes[len(nodes) - count:]
+            del nodes[len(nodes) - count:]
+            nodes.append(Node.List(loc, values))
+        elif code == IDENT:
+            nodes.append(Node.Ident(loc, symbol(next(items))))
+        else:
+            nodes.append(node_tags[code](loc, next(items)))
+    return nodes
+
+def load_cache(path, digest):
+    """
+    Returns the nodes cached at `path` if they were parsed from a source
+    with the SHA-256 `digest` by this version of the interpreter, or
+    None otherwise.
+    """
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    if len(data) < header.size:
+        return None
+    magic, version, marshal_version, cached_digest = header.unpack_from(data)
+    if (magic, version, marshal_version, cached_digest) != (MAGIC, CACHE_VERSION, marshal.version, digest):
+        return None
+    stream = io.BytesIO(data)
+    stream.seek(header.size)
+    nodes = []
+    try:
+        # A file cut short ends before the None, however many batches
+        # it still holds
+        while (items := marshal.load(stream)) is not None:
+            nodes.extend(decode(items))
+    except (ValueError, EOFError, TypeError, IndexError, KeyError, StopIteration):
+        return None
+    return nodes
+
+class CacheWriter:
+    """
+    Writes nodes to the cache at `path` as they are added, a batch at a
+    time, so that they don't all have to be kept around. The cache only
+    replaces the one at `path` once `commit` is called.
+
+    Note: failing to write the cache is not an error, since it is only
+    used to skip parsing. The writer just stops writing.
+    """
+    def __init__(self, path, digest):
+        self.path = path
+        self.temp_path = f"{path}.{os.getpid()}.tmp"
+        self.batch = []
+        self.file = None
+        try:
+            self.file = open(self.temp_path, "wb")
+            self.file.write(header.pack(MAGIC, CACHE_VERSION, marshal.version, digest))
+        except OSError:
+            self.close()
+
+    def add(self, node):
+        if self.file is None:
+            return
+        self.batch.append(node)
+        if len(self.batch) >= BATCH_SIZE:
+            self.flush()
+
+    def flush(self):
+        try:
+            marshal.dump(encode(self.batch), self.file)
+        except OSError:
+            self.close()
+        self.batch = []
+
+    def commit(self):
+        if self.file is not None and self.batch:
+            self.flush()
+        if self.file is None:
+            return
+        try:
+            marshal.dump(None, self.file)
+            self.file.close()
+            os.replace(self.temp_path, self.path)
+        except OSError:
+            self.close()
+        self.file = None
+
+    def close(self):
+        """
+        Gives up on the cache, unless it was committed.
+        """
+        if self.file is None:
+            return
+        self.file.close()
+        self.file = None
+        try:
+            os.remove(self.temp_path)
+        except OSError:
+            pass
+
+def save_cache(path, digest, nodes):
+    """
+    Writes `nodes` to `path`.
+    """
+    writer = CacheWriter(path, digest)
+    for node in nodes:
+        writer.add(node)
+    writer.commit()
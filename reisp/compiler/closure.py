@@ -0,0 +1,347 @@
+from reisp.ast.node import Node, TailCall
+from reisp.ast.node_err import NodeErr, EvalError
+from reisp.std.operators import (op_not, op_plus, op_minus, op_mult, op_div, op_mod, op_eq,
+                                 op_neq, op_less, op_greater, op_leq, op_geq)
+from reisp.std.func import func_set, func_let, func_lambda, func_if, is_truthy, make_lambda
+from reisp.types.type import Type
+from reisp.symbol import symbol
+import operator
+
+def compile_body(body):
+    # The code is kept on the body, so it goes away along with it
+    if body.closure_code is None:
+        body.closure_code = compile_node(body, True)
+    return body.closure_code
+
+def call_user(func, values, env):
+    # Like `UserFunc.call`, calls in tail position come back to this
+    # loop instead of nesting
+    mark = env.depth()
+    while True:
+        func.bind(env, mark, values)
+        result = compile_body(func.body)(env)
+        if not isinstance(result, TailCall):
+            env.unwind(mark)
+            return result
+        func, values = result.func, result.values
+
+def evaluate(node, env):
+    """
+    Evaluates `node` and returns its value, or the error it ran into.
+    Compiled code raises errors as `EvalError` rather than returning
+    them, so that the common case doesn't check every value it gets.
+    They are turned back into values here, after popping the frames
+    that were left behind.
+    """
+    mark = env.depth()
+    try:
+        return compile_node(node)(env)
+    except EvalError as e:
+        env.unwind(mark)
+        return e.err
+
+def compile_node(node, tail=False):
+    """
+    Compiles `node` into a closure that takes an `Env` and returns the
+    same value as `node.eval(env)`, or `node.eval_tail(env)` if `tail`
+    is set. Instead of returning an error, it raises an `EvalError`.
+    Everything that does not depend on the environment, such as which
+    builtin a call is meant to reach and how many arguments it has, is
+    worked out here once.
+    """
+    if isinstance(node, Node.Ident):
+        return compile_ident(node)
+    elif isinstance(node, Node.Quote):
+        value = node.eval(None)
+        return lambda env: value
+    elif isinstance(node, Node.List) and node.values:
+        return compile_call(node, tail)
+    elif isinstance(node, Node.Folded):
+        return compile_folded(node, tail)
+    elif isinstance(node, Node.Checked):
+        plain = compile_plain(node)
+        loc = node.loc
+        result = Node.Int if isinstance(node.proven, Type.Int) else Node.Bool
+        return guard(node.deps, lambda env: result(loc, plain(env)), compile_node(node.original, tail))
+    return lambda env: node
+
+def compile_folded(node, tail):
+    value = node.value
+    deps = node.deps
+    original = compile_node(node.original, tail)
+    def run(env):
+        for name, builtin in deps:
+            if env.get(name) is not builtin:
+                return original(env)
+        return value
+    return run
+
+def guard(deps, fast, slow):
+    # Runs `fast` while each name in `deps` still refers to the builtin
+    # paired with it, and `slow` otherwise
+    def run(env):
+        for name, builtin in deps:
+            if env.get(name) is not builtin:
+                return slow(env)
+        return fast(env)
+    return run
+
+def compile_plain(node):
+    """
+    Compiles the `Node.Checked` call `node` into a closure that returns
+    the plain value of the call. Nothing in it checks the operators
+    again, which the code around it does once for all of them.
+    """
+    op = node.op
+    codes = [compile_plain(arg) if isinstance(arg, Node.Checked) else compile_operand(arg)
+             for arg in node.original.values[1:]]
+    if len(codes) == 1:
+        arg, = codes
+        return lambda env: op(arg(env))
+    left, right = codes
+    return lambda env: op(left(env), right(env))
+
+def compile_ident(node):
+    name = node.value
+    loc = node.loc
+    def run(env):
+        if (value := env.get(name)) is None:
+            raise EvalError(NodeErr.IdentNotFound(loc, name))
+        return value
+    return run
+
+def compile_call(node, tail):
+    head = node.values[0]
+    head_code = compile_node(head)
+    call = compile_generic(node, tail)
+    if (op := operator_call(node)) is not None:
+        builtin, raw, result = op
+        loc = node.loc
+        if result is Node.Bool:
+            # Nodes never change, so a call site can hand out the same
+            # two results every time
+            true_node = Node.Bool(loc, True)
+            false_node = Node.Bool(loc, False)
+            def run_bool(env):
+                func = head_code(env)
+                if func is builtin:
+                    return true_node if raw(env) else false_node
+                return call(func, env)
+            return run_bool
+        def run_int(env):
+            func = head_code(env)
+            if func is builtin:
+                return Node.Int(loc, raw(env))
+            return call(func, env)
+        return run_int
+    builtin = special = None
+    if isinstance(head, Node.Ident) and head.value in specialized:
+        builtin, specialize = specialized[head.value]
+        if builtin.arity == len(node.values) - 1:
+            special = specialize(node, [compile_node(arg) for arg in node.values[1:]], tail)
+    def run(env):
+        func = head_code(env)
+        if func is builtin and special is not None:
+            return special(env)
+        return call(func, env)
+    return run
+
+def compile_generic(node, tail):
+    """
+    Compiles the call `node` for when its head isn't the builtin it was
+    specialized for, if any. The returned function takes the evaluated
+    head along with the `Env`.
+    """
+    head = node.values[0]
+    args = node.values[1:]
+    # Only needed when the head is a user function, so compiled lazily
+    # rather than alongside the specialized code
+    arg_codes = None
+    def call(func, env):
+        nonlocal arg_codes
+        if not func.is_callable():
+            raise EvalError(NodeErr.NotCallable(head.loc, func))
+        elif not isinstance(func, Node.UserFunc) or len(func.args) != len(args):
+            if (result := func.call(node, env, args)).is_err():
+                raise EvalError(result)
+            return result
+        if arg_codes is None:
+            arg_codes = [compile_node(arg) for arg in args]
+        values = [code(env) for code in arg_codes]
+        if func.memo is not None:
+            return func.memo.call(values, lambda: call_user(func, values, env))
+        elif tail:
+            return TailCall(func, values)
+        return call_user(func, values, env)
+    return call
+
+def operator_call(node):
+    """
+    If `node` calls an operator by name, returns the builtin along with
+    code computing the plain Python value of the call and the node type
+    that value is returned in.
+    """
+    head = node.values[0]
+    if not isinstance(head, Node.Ident) or head.value not in operators:
+        return None
+    builtin, specialize, result = operators[head.value]
+    if builtin.arity != len(node.values) - 1:
+        return None
+    return builtin, specialize(node, [compile_operand(arg) for arg in node.values[1:]]), result
+
+def compile_operand(node):
+    """
+    Compiles `node` into a closure that returns the `value` of what it
+    evaluates to, without putting it in a node when it is computed by
+    an operator or written as a literal.
+    """
+    if isinstance(node, (Node.Int, Node.Bool, Node.Str)):
+        value = node.value
+        return lambda env: value
+    elif isinstance(node, Node.Ident):
+        name = node.value
+        loc = node.loc
+        def run_ident(env):
+            if (value := env.get(name)) is None:
+                raise EvalError(NodeErr.IdentNotFound(loc, name))
+            return value.value
+        return run_ident
+    elif isinstance(node, Node.List) and node.values and (op := operator_call(node)) is not None:
+        builtin, raw, _ = op
+        head_code = compile_node(node.values[0])
+        call = compile_generic(node, False)
+        def run(env):
+            func = head_code(env)
+            if func is builtin:
+                return raw(env)
+            return call(func, env).value
+        return run
+    elif isinstance(node, Node.Checked):
+        original = compile_node(node.original)
+        return guard(node.deps, compile_plain(node), lambda env: original(env).value)
+    code = compile_node(node)
+    return lambda env: code(env).value
+
+def compile_test(node):
+    # Like `compile_node`, but returns whether the value is truthy
+    if isinstance(node, Node.List) and node.values and (op := operator_call(node)) is not None:
+        builtin, raw, _ = op
+        head_code = compile_node(node.values[0])
+        call = compile_generic(node, False)
+        def run(env):
+            func = head_code(env)
+            if func is builtin:
+                # Operators only give False for a false `Node.Bool`
+                return raw(env) is not False
+            return is_truthy(call(func, env))
+        return run
+    code = compile_node(node)
+    return lambda env: is_truthy(code(env))
+
+def unary(op):
+    def specialize(node, codes):
+        arg, = codes
+        return lambda env: op(arg(env))
+    return specialize
+
+def binary(op):
+    def specialize(node, codes):
+        left, right = codes
+        return lambda env: op(left(env), right(env))
+    return specialize
+
+def specialize_div(node, codes):
+    left, right = codes
+    right_loc = node.values[2].loc
+    def run(env):
+        left_value = left(env)
+        if (right_value := right(env)) == 0:
+            raise EvalError(NodeErr.ZeroDiv(right_loc))
+        return left_value // right_value
+    return run
+
+def specialize_set(node, codes, tail):
+    if not isinstance(node.values[1], Node.Ident):
+        return None
+    name = symbol(node.values[1].value)
+    value_code = codes[1]
+    loc = node.loc
+    def run(env):
+        value = value_code(env)
+        if env.get(name):
+            raise EvalError(NodeErr.VarAlreadyExists(loc, name))
+        env.add(name, value)
+        return value
+    return run
+
+def specialize_let(node, codes, tail):
+    binding = node.values[1]
+    body = compile_node(node.values[2], tail)
+    if not isinstance(binding, Node.List):
+        return None
+    elif not binding.values:
+        def run_empty(env):
+            env.push()
+            if not isinstance(result := body(env), TailCall):
+                env.pop()
+            return result
+        return run_empty
+    elif len(binding.values) != 2 or not isinstance(binding.values[0], Node.Ident):
+        return None
+    name = symbol(binding.values[0].value)
+    value_code = compile_node(binding.values[1])
+    def run(env):
+        value = value_code(env)
+        env.push()
+        env.add(name, value)
+        if not isinstance(result := body(env), TailCall):
+            env.pop()
+        return result
+    return run
+
+def specialize_if(node, codes, tail):
+    test = compile_test(node.values[1])
+    then_code = compile_node(node.values[2], tail)
+    else_code = compile_node(node.values[3], tail)
+    def run(env):
+        if test(env):
+            return then_code(env)
+        return else_code(env)
+    return run
+
+def specialize_lambda(node, codes, tail):
+    params = node.values[1]
+    if not isinstance(params, Node.List) or not all(isinstance(param, Node.Ident) for param in params.values):
+        return None
+    names = [symbol(param.value) for param in params.values]
+    body = node.values[2]
+    compile_body(body)
+    loc = node.loc
+    return lambda env: make_lambda(loc, names, body, env)
+
+# The operators, keyed by name, with code computing their result as a
+# plain Python value and the node type the builtin returns it in
+operators = {builtin.name: (builtin, specialize, result) for builtin, specialize, result in [
+    (op_not, unary(operator.not_), Node.Bool),
+    (op_plus, binary(operator.add), Node.Int),
+    (op_minus, binary(operator.sub), Node.Int),
+    (op_mult, binary(operator.mul), Node.Int),
+    (op_div, specialize_div, Node.Int),
+    (op_mod, binary(operator.mod), Node.Int),
+    (op_eq, binary(operator.eq), Node.Bool),
+    (op_neq, binary(operator.ne), Node.Bool),
+    (op_less, binary(operator.lt), Node.Bool),
+    (op_greater, binary(operator.gt), Node.Bool),
+    (op_leq, binary(operator.le), Node.Bool),
+    (op_geq, binary(operator.ge), Node.Bool)
+]}
+
+# The other builtins with a compiled fast path, keyed by name. Like the
+# operators, the fast path is only taken when the name still refers to
+# that builtin at run time.
+specialized = {builtin.name: (builtin, specialize) for builtin, specialize in [
+    (func_set, specialize_set),
+    (func_let, specialize_let),
+    (func_lambda, specialize_lambda),
+    (func_if, specialize_if)
+]}
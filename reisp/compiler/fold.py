@@ -0,0 +1,124 @@
+from reisp.ast.node import Node
+from reisp.std.operators import (operator_exports, op_plus, op_minus, op_mult, op_div, op_mod,
+                                 op_less, op_greater, op_leq, op_geq)
+from reisp.std.func import func_let, func_if
+from reisp.symbol import symbol
+
+# The builtins that always give the same result for the same values
+foldable = {builtin.name: builtin for builtin in [*operator_exports, func_if]}
+
+# The operators that only take ints. The others take any value but nil.
+int_operators = {builtin.name for builtin in [op_plus, op_minus, op_mult, op_div, op_mod,
+                                              op_less, op_greater, op_leq, op_geq]}
+
+literals = (Node.Nil, Node.Bool, Node.Int, Node.Str)
+
+def is_const(node):
+    return isinstance(node, literals) or isinstance(node, Node.Folded)
+
+def const_value(node):
+    if isinstance(node, Node.Folded):
+        return node.value, node.deps
+    return node, ()
+
+def valid_operands(name, values):
+    # Whether the builtin `name` can be run on the constants `values`
+    # without failing on their types
+    if name == func_if.name:
+        return True
+    elif name in int_operators:
+        return all(isinstance(const_value(value)[0], Node.Int) for value in values)
+    return not any(isinstance(const_value(value)[0], Node.Nil) for value in values)
+
+def merge_deps(*deps):
+    merged = {}
+    for pairs in deps:
+        merged.update(pairs)
+    return tuple(merged.items())
+
+def strip(node):
+    # A substituted variable that didn't fold into anything is cheaper
+    # to look up than to guard
+    if isinstance(node, Node.Folded) and isinstance(node.original, Node.Ident):
+        return node.original
+    return node
+
+def fold(node, env, scope=None):
+    """
+    Returns a copy of `node` in which calls to the operators and `if`
+    on constant arguments are replaced by their value, as are the
+    variables bound to constants by an enclosing `let`. `scope` maps
+    the names bound by enclosing `let`s and parameters to their value
+    and dependencies, or to None if they aren't constant.
+
+    Note: scoping is dynamic, so a caller could rebind an operator
+    (or `let`) by the time a folded form runs. Each folded value is a
+    `Node.Folded` that checks the builtins it relies on first, and
+    evaluates the original form if any of them changed. Calls that
+    fail, like a division by zero, are left to fail when they run.
+    """
+    scope = scope or {}
+    if isinstance(node, Node.Ident):
+        if entry := scope.get(node.value):
+            value, deps = entry
+            return Node.Folded(node.loc, value, deps, node)
+        return node
+    elif not isinstance(node, Node.List) or not node.values:
+        return node
+    head = node.values[0]
+    args = node.values[1:]
+    name = None
+    if isinstance(head, Node.Ident) and head.value not in scope:
+        name = head.value
+    if name == "let" and len(args) == 2 and isinstance(args[0], Node.List):
+        return fold_let(node, env, scope)
+    elif name == "lambda" and len(args) == 2 and isinstance(args[0], Node.List):
+        return fold_lambda(node, env)
+    elif name == "set" and len(args) == 2:
+        return Node.List(node.loc, [head, args[0], strip(fold(args[1], env, scope))])
+    values = [strip(fold(value, env, scope)) if value is head else fold(value, env, scope) for value in node.values]
+    folded = Node.List(node.loc, values)
+    builtin = foldable.get(name)
+    if (builtin is not None and builtin.arity == len(args) and env.get(name) is builtin
+            and all(is_const(value) for value in values[1:]) and valid_operands(name, values[1:])):
+        # Whatever goes wrong is left for the call to report when (and
+        # if) it runs, such as `%` by zero in a branch that is never taken
+        try:
+            result = builtin.func(folded, env, values[1:])
+        except Exception:
+            result = None
+        if result is not None and not result.is_err():
+            value, deps = const_value(result)
+            deps = merge_deps(*(const_value(arg)[1] for arg in values[1:]), deps, [(name, builtin)])
+            return Node.Folded(node.loc, value, deps, folded)
+    return Node.List(node.loc, [strip(value) for value in values])
+
+def fold_let(node, env, scope):
+    head, binding, body = node.values
+    if not binding.values:
+        return Node.List(node.loc, [head, binding, strip(fold(body, env, scope))])
+    elif len(binding.values) != 2 or not isinstance(binding.values[0], Node.Ident):
+        return node
+    name, value = binding.values
+    value = fold(value, env, scope)
+    entry = None
+    if is_const(value):
+        entry = const_value(value)
+        entry = (entry[0], merge_deps(entry[1], [("let", func_let)]))
+    body = fold(body, env, {**scope, symbol(name.value): entry})
+    result = Node.List(node.loc, [head, Node.List(binding.loc, [name, strip(value)]), strip(body)])
+    # Nothing can see the binding if the body is constant
+    if entry is not None and is_const(body):
+        value, deps = const_value(body)
+        return Node.Folded(node.loc, value, merge_deps(entry[1], deps), result)
+    return result
+
+def fold_lambda(node, env):
+    head, params, body = node.values
+    if not all(isinstance(param, Node.Ident) for param in params.values):
+        return node
+    # The body runs wherever the function is called, so nothing from
+    # around the lambda carries over except that its parameters are
+    # not constant
+    scope = {symbol(param.value): None for param in params.values}
+    return Node.List(node.loc, [head, params, strip(fold(body, env, scope))])
@@ -1,14 +1,32 @@
+from reisp.env import watch
+
 class Env:
     def __init__(self):
         self.frames = [{}]
 
     def get(self, name):
-        for frame in self.frames[::-1]:
+        for frame in reversed(self.frames):
+            if name in frame:
+                return frame[name]
+        return None
+
+    def get_global(self, name):
+        return self.frames[0].get(name)
+
+    def get_local(self, name):
+        # Like `get`, but leaves out the global frame
+        for frame in reversed(self.frames[1:]):
             if name in frame:
                 return frame[name]
         return None
 
+    def get_slot(self, depth, slot, name):
+        # Frames here are keyed by name only
+        return self.get(name)
+
     def add(self, name, value):
+        if name in watch.watched:
+            watch.bump()
         self.frames[-1][name] = value
 
     def push(self):
@@ -16,3 +34,26 @@ class Env:
 
     def pop(self):
         self.frames.pop()
+
+    def rebind(self, depth, names, values):
+        """
+        Replaces the frames above `depth` with one frame that binds
+        `names` to `values` on top of everything those frames bound, or
+        pushes that frame if there are none.
+        """
+        if not watch.watched.isdisjoint(names):
+            watch.bump()
+        frame = {}
+        for old in self.frames[depth:]:
+            frame.update(old)
+        frame.update(zip(names, values))
+        self.frames[depth:] = [frame]
+
+    def depth(self):
+        return len(self.frames)
+
+    def unwind(self, depth):
+        """
+        Pops frames until only `depth` are left.
+        """
+        del self.frames[depth:]
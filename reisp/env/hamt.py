@@ -0,0 +1,125 @@
+# Each level of the trie takes this many bits of the hash
+BITS = 5
+MASK = (1 << BITS) - 1
+HASH_BITS = 64
+
+class Bitmap:
+    """
+    A node of the trie. `bitmap` has a bit set for each slot that is in
+    use at this level, and `entries` holds those slots in order, each a
+    `(key, value)` pair or a node one level down.
+    """
+    def __init__(self, bitmap, entries):
+        self.bitmap = bitmap
+        self.entries = entries
+
+    def set(self, key, h, shift, value):
+        # Returns the node with `key` set and whether it was added
+        bit = 1 << ((h >> shift) & MASK)
+        index = (self.bitmap & (bit - 1)).bit_count()
+        if not self.bitmap & bit:
+            entries = self.entries[:index] + ((key, value),) + self.entries[index:]
+            return Bitmap(self.bitmap | bit, entries), True
+        entry = self.entries[index]
+        added = False
+        if not isinstance(entry, tuple):
+            entry, added = entry.set(key, h, shift + BITS, value)
+        elif entry[0] == key:
+            entry = (key, value)
+        else:
+            entry = split(entry, (key, value), h, shift + BITS)
+            added = True
+        return Bitmap(self.bitmap, self.entries[:index] + (entry,) + self.entries[index + 1:]), added
+
+    def items(self):
+        for entry in self.entries:
+            if isinstance(entry, tuple):
+                yield entry
+            else:
+                yield from entry.items()
+
+class Collision:
+    """
+    The keys with the same full hash, which can't be told apart by any
+    level of the trie.
+    """
+    def __init__(self, h, entries):
+        self.hash = h
+        self.entries = entries
+
+    def find(self, key, default):
+        for entry in self.entries:
+            if entry[0] == key:
+                return entry[1]
+        return default
+
+    def set(self, key, h, shift, value):
+        if h != self.hash:
+            return Bitmap(1 << ((self.hash >> shift) & MASK), (self,)).set(key, h, shift, value)
+        for i, entry in enumerate(self.entries):
+            if entry[0] == key:
+                return Collision(h, self.entries[:i] + ((key, value),) + self.entries[i + 1:]), False
+        return Collision(h, self.entries + ((key, value),)), True
+
+    def items(self):
+        yield from self.entries
+
+def key_hash(key):
+    return hash(key) & ((1 << HASH_BITS) - 1)
+
+def split(old, new, h, shift):
+    # Returns a node holding the entries `old` and `new`, which were in
+    # the same slot one level up
+    old_hash = key_hash(old[0])
+    if old_hash == h or shift >= HASH_BITS:
+        return Collision(h, (old, new))
+    old_slot = (old_hash >> shift) & MASK
+    new_slot = (h >> shift) & MASK
+    if old_slot == new_slot:
+        return Bitmap(1 << old_slot, (split(old, new, h, shift + BITS),))
+    entries = (old, new) if old_slot < new_slot else (new, old)
+    return Bitmap((1 << old_slot) | (1 << new_slot), entries)
+
+class Hamt:
+    """
+    A persistent map from hashable keys to values, as a hash array
+    mapped trie. Nothing in it is ever changed: `set` returns a new map
+    that shares all but the O(log n) nodes on the path to the key with
+    this one, which stays as it was. Copying a map is therefore just
+    keeping a reference to it.
+    """
+    def __init__(self, root=None, size=0):
+        self.root = root
+        self.size = size
+
+    def get(self, key, default=None):
+        node = self.root
+        h = key_hash(key)
+        shift = 0
+        while node is not None:
+            if isinstance(node, Collision):
+                return node.find(key, default) if node.hash == h else default
+            bit = 1 << ((h >> shift) & MASK)
+            if not node.bitmap & bit:
+                return default
+            node = node.entries[(node.bitmap & (bit - 1)).bit_count()]
+            if isinstance(node, tuple):
+                return node[1] if node[0] == key else default
+            shift += BITS
+        return default
+
+    def set(self, key, value):
+        root = self.root if self.root is not None else Bitmap(0, ())
+        root, added = root.set(key, key_hash(key), 0, value)
+        return Hamt(root, self.size + added)
+
+    def items(self):
+        if self.root is not None:
+            yield from self.root.items()
+
+    def __contains__(self, key):
+        missing = object()
+        return self.get(key, missing) is not missing
+
+    def __len__(self):
+        return self.size
@@ -0,0 +1,91 @@
+from reisp.env import watch
+from reisp.env.hamt import Hamt
+
+class PersistentEnv:
+    """
+    An `Env` whose state is made of persistent maps, so that `fork`
+    copies it in O(1), however many globals it holds. Adding a binding
+    costs O(log n) and never changes what a fork sees.
+
+    Note: rather than a map per frame, `locals` maps each name to its
+    innermost binding in any frame but the global one, which is what
+    dynamic scoping looks up. Each frame only remembers what `locals`
+    was when it was pushed, so popping it is just restoring that.
+    """
+    def __init__(self):
+        self.globals = Hamt()
+        self.locals = Hamt()
+        # What `locals` was before each frame was pushed, innermost
+        # first, as a linked list of pairs
+        self.saved = None
+        self.count = 0
+
+    def fork(self):
+        """
+        Returns a copy of the environment. Binding names in either one
+        doesn't affect the other.
+        """
+        env = PersistentEnv()
+        env.globals = self.globals
+        env.locals = self.locals
+        env.saved = self.saved
+        env.count = self.count
+        return env
+
+    def get(self, name):
+        if (value := self.locals.get(name)) is not None:
+            return value
+        return self.globals.get(name)
+
+    def get_global(self, name):
+        return self.globals.get(name)
+
+    def get_local(self, name):
+        return self.locals.get(name)
+
+    def get_slot(self, depth, slot, name):
+        # Bindings here are keyed by name only
+        return self.get(name)
+
+    def add(self, name, value):
+        if name in watch.watched:
+            watch.bump()
+        if self.count:
+            self.locals = self.locals.set(name, value)
+        else:
+            self.globals = self.globals.set(name, value)
+
+    def push(self):
+        self.saved = (self.locals, self.saved)
+        self.count += 1
+
+    def pop(self):
+        self.locals, self.saved = self.saved
+        self.count -= 1
+
+    def rebind(self, depth, names, values):
+        """
+        Replaces the frames above `depth` with one frame that binds
+        `names` to `values` on top of everything those frames bound, or
+        pushes that frame if there are none.
+        """
+        if self.count < depth:
+            self.push()
+        else:
+            # What the frames bound is kept in `locals`, so only their
+            # saved states have to go
+            while self.count > depth:
+                self.saved = self.saved[1]
+                self.count -= 1
+        for name, value in zip(names, values):
+            self.add(name, value)
+
+    def depth(self):
+        return self.count + 1
+
+    def unwind(self, depth):
+        """
+        Pops frames until only `depth` are left.
+        """
+        while self.count >= depth:
+            self.pop()
@@ -0,0 +1,106 @@
+from reisp.ast.node import Node
+from reisp.symbol import symbol
+
+def lookup(scopes, name):
+    for depth, scope in enumerate(reversed(scopes)):
+        if name in scope:
+            return depth, scope[name]
+    return None
+
+def resolve(node, scopes=None):
+    """
+    Returns a copy of `node` in which every identifier bound by an
+    enclosing `let`, or by the parameters of the `lambda` whose body it
+    is in, is replaced by a `Node.Local` holding its frame depth and
+    slot. `scopes` is the list of frames that are known to be on top of
+    the environment when `node` runs, each mapping names to slots.
+
+    Note: scoping is dynamic, so a `lambda` body starts again from just
+    its parameters; anything else it refers to depends on the caller
+    and is left as a plain `Node.Ident`. The same goes for quoted forms.
+    """
+    scopes = scopes or []
+    if isinstance(node, Node.Ident):
+        if (address := lookup(scopes, node.value)) is None:
+            return node
+        return Node.Local(node.loc, node.value, *address)
+    elif isinstance(node, Node.Checked):
+        return Node.Checked(node.loc, node.proven, node.deps, resolve(node.original, scopes), node.op)
+    elif not isinstance(node, Node.List) or not node.values:
+        return node
+    head = node.values[0]
+    args = node.values[1:]
+    # `let` and `lambda` only get special treatment when they can't be
+    # local variables, though a caller could still rebind them. In that
+    # case `SlotEnv.get_slot` notices that the slots don't match.
+    if isinstance(head, Node.Ident) and lookup(scopes, head.value) is None and len(args) == 2:
+        if head.value == "let" and isinstance(args[0], Node.List):
+            return resolve_let(node, scopes)
+        elif head.value == "lambda" and isinstance(args[0], Node.List):
+            return resolve_lambda(node, scopes)
+        elif head.value == "set" and isinstance(args[0], Node.Ident):
+            # The name being set is not looked up, so `set` can tell
+            # that it is already bound
+            return Node.List(node.loc, [head, args[0], resolve(args[1], scopes)])
+    return Node.List(node.loc, [resolve(value, scopes) for value in node.values])
+
+def resolve_let(node, scopes):
+    head, binding, body = node.values
+    if not binding.values:
+        return Node.List(node.loc, [head, binding, resolve(body, scopes + [{}])])
+    elif len(binding.values) != 2 or not isinstance(binding.values[0], Node.Ident):
+        return node
+    name, value = binding.values
+    binding = Node.List(binding.loc, [name, resolve(value, scopes)])
+    return Node.List(node.loc, [head, binding, resolve(body, scopes + [{symbol(name.value): 0}])])
+
+def resolve_lambda(node, scopes):
+    head, params, body = node.values
+    if not all(isinstance(param, Node.Ident) for param in params.values):
+        return node
+    names = [symbol(param.value) for param in params.values]
+    # The variables bound around the lambda here are captured when it
+    # is made, and take the slots after the parameters (see
+    # `reisp.std.func.make_lambda`). A repeated parameter is bound
+    # twice, and the later one wins.
+    names += [name for name in free_names(names, body) if lookup(scopes, name) is not None]
+    scope = {name: slot for slot, name in enumerate(names)}
+    return Node.List(node.loc, [head, params, resolve(body, [scope])])
+
+def free_names(params, body):
+    """
+    Returns the names that `body`, the body of a function with `params`,
+    refers to without binding them itself, in the order they first
+    appear. The result is kept on `body`.
+    """
+    if body.free_names is None:
+        names = {}
+        collect_free(body, set(params), names)
+        body.free_names = list(names)
+    return body.free_names
+
+def collect_free(node, bound, names):
+    if isinstance(node, (Node.Ident, Node.Local)):
+        if node.value not in bound:
+            names[symbol(node.value)] = None
+        return
+    elif isinstance(node, (Node.Folded, Node.Checked)):
+        collect_free(node.original, bound, names)
+        return
+    elif not isinstance(node, Node.List) or not node.values:
+        return
+    head = node.values[0]
+    args = node.values[1:]
+    if isinstance(head, Node.Ident) and head.value not in bound and len(args) == 2 and isinstance(args[0], Node.List):
+        binding = args[0].values
+        if head.value == "let" and len(binding) == 2 and isinstance(binding[0], Node.Ident):
+            collect_free(head, bound, names)
+            collect_free(binding[1], bound, names)
+            collect_free(args[1], bound | {symbol(binding[0].value)}, names)
+            return
+        elif head.value == "lambda" and all(isinstance(param, Node.Ident) for param in binding):
+            collect_free(head, bound, names)
+            collect_free(args[1], bound | {symbol(param.value) for param in binding}, names)
+            return
+    for value in node.values:
+        collect_free(value, bound, names)
@@ -0,0 +1,119 @@
+from reisp.ast.node import Node
+from reisp.std.func import func_set
+from reisp.env import watch
+from dataclasses import dataclass, field
+
+@dataclass(eq=False)
+class Form:
+    node: 'BaseNode'
+    # The global the form defines, if it is a top-level `set`
+    name: str
+    # The globals the form looked up the last time it ran
+    reads: set = field(default_factory=set)
+    value: 'BaseNode' = None
+
+def ordered(forms):
+    """
+    Returns `forms` in an order in which each one comes after the forms
+    defining what it read, and otherwise in the order given. Forms that
+    depend on each other are left in the order given.
+    """
+    order = []
+    remaining = list(forms)
+    while remaining:
+        waiting = {form.name for form in remaining if form.name is not None}
+        ready = [form for form in remaining if form.reads.isdisjoint(waiting - {form.name})]
+        if not ready:
+            ready = remaining
+        order.extend(ready)
+        ready = set(map(id, ready))
+        remaining = [form for form in remaining if id(form) not in ready]
+    return order
+
+class Session:
+    """
+    Evaluates top-level forms one at a time like a REPL, and remembers
+    each form that succeeded along with its value and the globals it
+    read. Unlike `set` on its own, a top-level `set` may define a name
+    again, after which the forms that depend on it are run again, and
+    only those. Their results are in `rerun` until the next form.
+
+    `env` is a `TrackingEnv` with the builtins in it, and `evaluate`
+    takes a form and the environment and returns its value.
+
+    Note: a form only depends on the globals it actually read, so a
+    function doesn't depend on the ones its body refers to until it is
+    called. A definition that runs again and gives a value equal to the
+    one it had doesn't make the forms depending on it run again.
+    """
+    def __init__(self, env, evaluate):
+        self.env = env
+        self.evaluate = evaluate
+        self.forms = []
+        # The forms that define a global, keyed by name
+        self.definitions = {}
+        self.rerun = []
+
+    def definition(self, node):
+        # Returns the name a top-level `set` defines, if `node` is one
+        if (isinstance(node, Node.List) and len(node.values) == 3
+                and isinstance(node.values[0], Node.Ident) and isinstance(node.values[1], Node.Ident)
+                and self.env.get_global(node.values[0].value) is func_set):
+            return node.values[1].value
+        return None
+
+    def run_form(self, form):
+        if form.name in self.definitions:
+            self.env.remove(form.name)
+        self.env.reads = set()
+        # Every call site has to look its function up again to have it
+        # recorded
+        watch.bump()
+        form.value = self.evaluate(form.node, self.env)
+        form.reads = self.env.reads
+        return form.value
+
+    def run(self, node):
+        """
+        Evaluates `node` and returns its value, or the error it ran into.
+        Nothing is remembered of a form that fails, and a definition
+        that fails leaves the one before it in place.
+        """
+        self.rerun = []
+        form = Form(node, self.definition(node))
+        old = self.definitions.get(form.name)
+        if (value := self.run_form(form)).is_err():
+            # A definition whose rerun failed has been left unbound
+            if old is not None and not old.value.is_err():
+                self.env.add(form.name, old.value)
+            return value
+        if old is None:
+            self.forms.append(form)
+        else:
+            self.forms[self.forms.index(old)] = form
+        if form.name is not None:
+            self.definitions[form.name] = form
+        if old is not None and value != old.value:
+            self.update(form)
+        return value
+
+    def update(self, changed_form):
+        # Runs again the forms depending on what `changed_form` defines
+        names = {changed_form.name}
+        affected = []
+        while True:
+            found = [form for form in self.forms if form is not changed_form and form not in affected
+                     and not form.reads.isdisjoint(names)]
+            if not found:
+                break
+            affected.extend(found)
+            names.update(form.name for form in found if form.name is not None)
+        changed = {changed_form.name}
+        for form in ordered(form for form in self.forms if form in affected):
+            if form.reads.isdisjoint(changed):
+                continue
+            old = form.value
+            self.run_form(form)
+            self.rerun.append(form)
+            if form.name is not None and form.value != old:
+                changed.add(form.name)
@@ -0,0 +1,107 @@
+from reisp.env import watch
+
+class SlotEnv:
+    """
+    An `Env` that keeps the values of every frame but the global one in
+    a single array, so that pushing a frame allocates nothing and a
+    `Node.Local` is read straight from its slot. The global frame is a
+    dict, since `set` can define any name there at any time.
+
+    Note: since scoping is dynamic, a name that isn't resolved to a slot
+    has to find the innermost binding of that name anywhere in the
+    stack. Each name therefore also keeps a stack of its own bindings
+    ("shallow binding"), which makes looking it up O(1) as well.
+    """
+    def __init__(self):
+        self.globals = {}
+        self.values = []
+        self.names = []
+        self.bases = []
+        self.bindings = {}
+
+    def get(self, name):
+        if bindings := self.bindings.get(name):
+            return bindings[-1]
+        return self.globals.get(name)
+
+    def get_global(self, name):
+        return self.globals.get(name)
+
+    def get_local(self, name):
+        if bindings := self.bindings.get(name):
+            return bindings[-1]
+        return None
+
+    def get_slot(self, depth, slot, name):
+        """
+        Returns the value in `slot` of the frame `depth` frames below the
+        top one. If that slot doesn't hold `name`, for example because
+        the frames were not made by the `let` or `lambda` the slot was
+        resolved against, this falls back to looking `name` up.
+        """
+        if depth < len(self.bases):
+            index = self.bases[-1 - depth] + slot
+            end = self.bases[-depth] if depth else len(self.values)
+            if index < end and self.names[index] is name:
+                return self.values[index]
+        return self.get(name)
+
+    def add(self, name, value):
+        if name in watch.watched:
+            watch.bump()
+        if not self.bases:
+            self.globals[name] = value
+            return
+        self.values.append(value)
+        self.names.append(name)
+        if (bindings := self.bindings.get(name)) is None:
+            bindings = self.bindings[name] = []
+        bindings.append(value)
+
+    def push(self):
+        self.bases.append(len(self.values))
+
+    def pop(self):
+        base = self.bases.pop()
+        for name in self.names[base:]:
+            self.bindings[name].pop()
+        del self.values[base:]
+        del self.names[base:]
+
+    def rebind(self, depth, names, values):
+        """
+        Replaces the frames above `depth` with one frame that binds
+        `names` to `values` on top of everything those frames bound, or
+        pushes that frame if there are none. `names` take the first
+        slots, like the parameters of a call.
+        """
+        if len(self.bases) < depth:
+            self.push()
+            kept = {}
+        else:
+            base = self.bases[depth - 1]
+            kept = dict(zip(self.names[base:], self.values[base:]))
+            for name in self.names[base:]:
+                self.bindings[name].pop()
+            del self.values[base:]
+            del self.names[base:]
+            del self.bases[depth:]
+            for name in names:
+                kept.pop(name, None)
+        for name, value in zip(names, values):
+            self.add(name, value)
+        # These were bound already, so no cache needs to know
+        for name, value in kept.items():
+            self.values.append(value)
+            self.names.append(name)
+            self.bindings[name].append(value)
+
+    def depth(self):
+        return len(self.bases) + 1
+
+    def unwind(self, depth):
+        """
+        Pops frames until only `depth` are left.
+        """
+        while len(self.bases) >= depth:
+            self.pop()
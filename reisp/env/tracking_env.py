@@ -0,0 +1,29 @@
+from reisp.env import watch
+from reisp.env.slot_env import SlotEnv
+
+class TrackingEnv(SlotEnv):
+    """
+    A `SlotEnv` that records the names looked up in the global frame,
+    so that a `Session` knows which definitions a form depends on.
+
+    Note: a call site that hits its inline cache doesn't look its head
+    up again (see `Node.List.callee`). The caches have to be dropped
+    with `watch.bump` before a run whose reads should all be recorded.
+    """
+    def __init__(self):
+        super().__init__()
+        self.reads = set()
+
+    def get(self, name):
+        if bindings := self.bindings.get(name):
+            return bindings[-1]
+        self.reads.add(name)
+        return self.globals.get(name)
+
+    def remove(self, name):
+        """
+        Removes the global `name`, so that `set` can define it again.
+        """
+        if name in watch.watched:
+            watch.bump()
+        self.globals.pop(name, None)
@@ -0,0 +1,15 @@
+# Call sites cache the function their head resolves to (see
+# `Node.List.callee`). A cached function stays valid until one of the
+# names it was found under is bound again, at which point `version` is
+# bumped and every cache misses once.
+
+# The names some call site has cached a function for
+watched = set()
+version = 0
+
+def watch(name):
+    watched.add(name)
+
+def bump():
+    global version
+    version += 1
@@ -2,6 +2,7 @@ from reisp.loc import Loc
 from reisp.lexer.token import TokenType, Token
 from reisp.lexer.lexer_err import LexErrType, LexErr
 from reisp.types.type import type_keywords
+from reisp.symbol import symbol
 from copy import copy
 
 def is_int(word):
@@ -80,4 +81,4 @@ class Lexer:
             return Token(TokenType.Bool, word, start)
         elif is_int(word):
             return Token(TokenType.Int, word, start)
-        return Token(TokenType.Ident, word, start)
+        return Token(TokenType.Ident, symbol(word), start)
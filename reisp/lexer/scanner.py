@@ -0,0 +1,159 @@
+from reisp.loc import Loc
+from reisp.lexer.token import TokenType, Token
+from reisp.lexer.lexer import is_int
+from reisp.lexer.lexer_err import LexErrType, LexErr
+from reisp.types.type import type_keywords
+from reisp.symbol import symbol
+import re
+
+# A single master pattern matching exactly one token (or a run of
+# whitespace) at a time. The alternatives are ordered the same way the
+# checks in `Lexer.__next__` are, so that e.g. a '"' only starts a
+# string when it is the first character of a token.
+token_pattern = re.compile(r"""
+    (?P<ws>[ \t\n]+)
+  | (?P<special>[?|$])
+  | (?P<paren>[()\[\]])
+  | (?P<quote>')
+  | "(?P<str>(?:[^"\\]|\\[\s\S])*)(?P<close>"?)
+  | (?P<word>[^ \t\n()\[\]?|]+)
+""", re.VERBOSE)
+
+escape_pattern = re.compile(r"\\([\s\S])")
+escapes = {"n": "\n", "\\": "\\", '"': '"'}
+
+word_types = {word: TokenType.Type for word in type_keywords}
+word_types["nil"] = TokenType.Nil
+word_types["true"] = TokenType.Bool
+word_types["false"] = TokenType.Bool
+
+def scan_str(text, start, match):
+    """
+    Checks and decodes the body of a string token matched at `start`.
+    Returns either the decoded value or a `(LexErrType, offset, resume)`
+    triple describing the first error the character lexer would hit.
+    """
+    body = match.group("str")
+    if "\\" in body:
+        body_start = match.start("str")
+        for escape in escape_pattern.finditer(body):
+            if escape.group(1) not in escapes:
+                offset = body_start + escape.start(1)
+                return (LexErrType.StrEsc, offset, offset + 1)
+    if not match.group("close"):
+        end = match.end()
+        if end < len(text):
+            # The body stopped in front of a lone trailing backslash
+            return (LexErrType.StrEof, len(text), len(text))
+        return (LexErrType.StrEof, start, len(text))
+    if "\\" in body:
+        return escape_pattern.sub(lambda escape: escapes[escape.group(1)], body)
+    return body
+
+def scan(text, pos=0):
+    """
+    Tokenizes `text` starting at offset `pos`, yielding
+    `(kind, value, start, end)` tuples. `kind` is a `TokenType`, or a
+    `LexErrType` in which case `start` is the offset of the error and
+    `end` is where scanning resumes. The last tuple is always an
+    `Eof` token.
+    """
+    match_at = token_pattern.match
+    length = len(text)
+    while pos < length:
+        match = match_at(text, pos)
+        start = pos
+        pos = match.end()
+        kind = match.lastgroup
+        if kind == "ws":
+            continue
+        elif kind == "word":
+            word = match.group()
+            if (word_type := word_types.get(word)) is not None:
+                yield (word_type, word, start, pos)
+            elif is_int(word):
+                yield (TokenType.Int, word, start, pos)
+            else:
+                yield (TokenType.Ident, symbol(word), start, pos)
+        elif kind == "special":
+            yield (TokenType.Special, match.group(), start, pos)
+        elif kind == "paren":
+            yield (TokenType.Paren, match.group(), start, pos)
+        elif kind == "quote":
+            yield (TokenType.Quote, "'", start, pos)
+        else:
+            value = scan_str(text, start, match)
+            if isinstance(value, tuple):
+                err_type, offset, pos = value
+                yield (err_type, None, offset, pos)
+            else:
+                yield (TokenType.Str, value, start, pos)
+    yield (TokenType.Eof, None, length, length)
+
+class Scanner:
+    def __init__(self, text, pos=0, line=0, col=0):
+        """
+        A bulk alternative to `Lexer` that tokenizes a whole string
+        with a single compiled pattern. It produces the same `Token`
+        and `LexErr` values as `Lexer`, with line and column numbers
+        counted from `line` and `col` at offset `pos`.
+
+        Note: a `Scanner` also implements the `loc`, `is_eol` and
+        `skip_line` parts of the source contract, so it can be passed
+        to `Parser` as both the source and the lexer.
+        """
+        self.text = text
+        self.tokens = scan(text, pos)
+        # Offset of the start of the last token and the offset just
+        # past its end
+        self.start = pos
+        self.pos = pos
+        self.line = line
+        # Offset of the first character of `self.line`. This may be
+        # negative if the text starts partway through a line.
+        self.line_start = pos - col
+        # Offset up to which newlines have been counted
+        self.counted = pos
+        self.done = False
+
+    def loc_at(self, offset):
+        """
+        Returns the location of `offset`, which must not be before the
+        start of the current line.
+        """
+        newlines = self.text.count("\n", self.counted, offset)
+        self.counted = max(self.counted, offset)
+        if newlines:
+            self.line += newlines
+            self.line_start = self.text.rfind("\n", 0, offset) + 1
+        return Loc(self.line, offset - self.line_start)
+
+    @property
+    def loc(self):
+        return self.loc_at(max(self.pos - 1, self.line_start))
+
+    def is_eol(self):
+        end = self.text.find("\n", self.pos)
+        if end == -1:
+            end = len(self.text)
+        return not self.text[self.pos:end].strip()
+
+    def skip_line(self):
+        end = self.text.find("\n", self.pos)
+        pos = len(self.text) if end == -1 else end + 1
+        self.tokens = scan(self.text, pos)
+        self.start = self.pos = pos
+        self.loc_at(pos)
+        self.done = False
+
+    def __next__(self):
+        if self.done:
+            return Token(TokenType.Eof, None, self.loc_at(len(self.text)))
+        kind, value, start, end = next(self.tokens)
+        self.start = start
+        self.pos = end
+        if kind is TokenType.Eof:
+            self.done = True
+        elif isinstance(kind, LexErrType):
+            return LexErr(kind, self.loc_at(start))
+        return Token(kind, value, self.loc_at(start))
@@ -0,0 +1,60 @@
+from reisp.loc import Loc
+from reisp.lexer.token import TokenType, Token
+from reisp.lexer.lexer_err import LexErrType, LexErr
+from reisp.lexer.scanner import scan
+from array import array
+from bisect import bisect_right
+
+kind_table = [*TokenType, *LexErrType]
+kind_codes = {kind: i for i, kind in enumerate(kind_table)}
+
+class TokenStream:
+    def __init__(self, text):
+        """
+        The tokens of `text` stored as parallel arrays of kind codes,
+        start and end offsets and indices into a table of interned
+        values. `Token` and `LexErr` objects are only built on demand
+        by `get`.
+
+        Note: like `Lexer`, the stream carries on after a `LexErr`, and
+        it always ends with a single `Eof` token.
+        """
+        self.text = text
+        self.kinds = array("B")
+        self.starts = array("Q")
+        self.ends = array("Q")
+        self.values = array("L")
+        self.strings = [None]
+        interned = {None: 0}
+        for kind, value, start, end in scan(text):
+            self.kinds.append(kind_codes[kind])
+            self.starts.append(start)
+            self.ends.append(end)
+            if (index := interned.get(value)) is None:
+                index = interned[value] = len(self.strings)
+                self.strings.append(value)
+            self.values.append(index)
+        self.line_starts = array("Q", [0])
+        offset = -1
+        while (offset := text.find("\n", offset + 1)) != -1:
+            self.line_starts.append(offset + 1)
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def kind(self, index):
+        return kind_table[self.kinds[index]]
+
+    def value(self, index):
+        return self.strings[self.values[index]]
+
+    def loc(self, offset):
+        line = bisect_right(self.line_starts, offset) - 1
+        return Loc(line, offset - self.line_starts[line])
+
+    def get(self, index):
+        kind = kind_table[self.kinds[index]]
+        loc = self.loc(self.starts[index])
+        if isinstance(kind, LexErrType):
+            return LexErr(kind, loc)
+        return Token(kind, self.strings[self.values[index]], loc)
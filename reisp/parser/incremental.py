@@ -0,0 +1,112 @@
+from reisp.parser.parser import Parser
+from reisp.lexer.scanner import Scanner
+from reisp.lexer.token import TokenType
+from reisp.ast.node import Node
+
+def shift_locs(node, line_delta, line=None, col_delta=0):
+    """
+    Moves every location in `node` down by `line_delta` lines. Locations
+    on `line` (before the move) are also moved right by `col_delta`.
+    """
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if node.loc.line == line:
+            node.loc.col += col_delta
+        node.loc.line += line_delta
+        if isinstance(node, Node.List):
+            stack.extend(node.values)
+        elif isinstance(node, Node.Quote):
+            stack.append(node.value)
+
+class Form:
+    def __init__(self, start, end, node):
+        """
+        A top-level form spanning the offsets `start` to `end`. `node`
+        is either the parsed node or the error that stopped parsing, in
+        which case the form runs to the end of the text.
+        """
+        self.start = start
+        self.end = end
+        self._node = node
+        # Lines the locations in `_node` still have to be moved by
+        self.line_delta = 0
+
+    @property
+    def node(self):
+        if self.line_delta:
+            shift_locs(self._node, self.line_delta)
+            self.line_delta = 0
+        return self._node
+
+class Document:
+    def __init__(self, text):
+        """
+        Keeps the top-level forms of `text` so that an edit only has to
+        re-lex and re-parse the forms it overlaps. Forms after the edit
+        are reused, with their locations moved to match the new text.
+        """
+        self.text = text
+        self.forms = []
+        self.forms.extend(self.parse_forms(0))
+
+    def loc_at(self, offset):
+        line = self.text.count("\n", 0, offset)
+        return line, offset - self.text.rfind("\n", 0, offset) - 1
+
+    def parse_forms(self, pos, resync=None):
+        """
+        Parses forms starting from `pos`. Stops early once a form ends at
+        an offset in `resync`, since the text after it is unchanged.
+        """
+        scanner = Scanner(self.text, pos, *self.loc_at(pos))
+        parser = Parser(scanner, lexer=scanner)
+        while True:
+            token = parser.peek()
+            if token.is_err():
+                yield Form(scanner.start, len(self.text), token)
+                return
+            elif token.type == TokenType.Eof:
+                return
+            start = scanner.start
+            if (node := parser.parse_expr()).is_err():
+                yield Form(start, len(self.text), node)
+                return
+            yield Form(start, scanner.pos, node)
+            if resync is not None and scanner.pos in resync:
+                return
+
+    def edit(self, start, end, text):
+        """
+        Replaces the text between the offsets `start` and `end` with
+        `text`. Returns the forms that had to be parsed again.
+        """
+        old_text = self.text
+        self.text = old_text[:start] + text + old_text[end:]
+        delta = len(text) - (end - start)
+        first = 0
+        while first < len(self.forms) and self.forms[first].end < start:
+            first += 1
+        pos = self.forms[first - 1].end if first else 0
+        # Old forms after the edit can be reused once a new form ends
+        # where one of them used to end
+        resync = {self.forms[i].end + delta: i for i in range(first, len(self.forms))
+                  if self.forms[i].end >= end}
+        new_forms = list(self.parse_forms(pos, resync))
+        if new_forms and new_forms[-1].end in resync:
+            reused = self.forms[resync[new_forms[-1].end] + 1:]
+        else:
+            reused = []
+        end_line = old_text.count("\n", 0, end)
+        end_col = end - old_text.rfind("\n", 0, end) - 1
+        new_line, new_col = self.loc_at(start + len(text))
+        line_delta = new_line - end_line
+        for form in reused:
+            form.start += delta
+            form.end += delta
+            if form._node.loc.line + form.line_delta == end_line:
+                shift_locs(form.node, line_delta, end_line, new_col - end_col)
+            else:
+                form.line_delta += line_delta
+        self.forms[first:] = new_forms + reused
+        return new_forms
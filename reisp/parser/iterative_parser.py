@@ -0,0 +1,42 @@
+from reisp.ast.node import Node
+from reisp.lexer.token import TokenType
+from reisp.parser.predictive_parser import PredictiveParser
+
+class IterativeParser(PredictiveParser):
+    """
+    A `PredictiveParser` that builds lists and quotes with an explicit
+    stack instead of recursion, so nesting is only limited by memory.
+
+    Note: type expressions are still parsed recursively, since they are
+    written by hand and nest only a few levels deep.
+    """
+
+    def parse_expr(self):
+        # Unfinished lists and quotes, innermost last. Each entry is the
+        # opening token and the values parsed so far, or None for a
+        # quote.
+        stack = []
+        while True:
+            token = self.peek()
+            if token.is_err():
+                return token
+            elif token.type == TokenType.Quote:
+                self.next_token()
+                stack.append((token, None))
+                continue
+            elif token.type == TokenType.Paren and token.value == "(":
+                self.next_token()
+                stack.append((token, []))
+                continue
+            elif stack and stack[-1][1] is not None and token.type == TokenType.Paren and token.value == ")":
+                self.next_token()
+                paren, values = stack.pop()
+                node = Node.List(values=values, loc=paren.loc)
+            elif (node := PredictiveParser.parse_expr(self)).is_err():
+                return node
+            while stack and stack[-1][1] is None:
+                quote, _ = stack.pop()
+                node = Node.Quote(value=node, loc=quote.loc)
+            if not stack:
+                return node
+            stack[-1][1].append(node)
@@ -0,0 +1,88 @@
+from reisp.parser.iterative_parser import IterativeParser
+from reisp.lexer.scanner import Scanner
+from reisp.cache.ast_cache import encode, decode
+from concurrent.futures import ProcessPoolExecutor
+import marshal
+import os
+import re
+
+MIN_CHUNK_SIZE = 1 << 16
+
+# Finds the parentheses and brackets that are not inside a string.
+# Strings are matched whole, and so are words containing a '"', since
+# the lexer only starts a string at the beginning of a token.
+paren_pattern = re.compile(r"""
+    "(?:[^"\\]|\\[\s\S])*"?
+  | [()\[\]]
+  | [^ \t\n()\[\]?|$'"][^ \t\n()\[\]?|"]*"[^ \t\n()\[\]?|]*
+""", re.VERBOSE)
+
+def split_offsets(text, count):
+    """
+    Returns up to `count - 1` offsets that split `text` into roughly
+    equal chunks. Every offset is just after a closing parenthesis or
+    bracket outside of any others, where the lexer starts afresh.
+    """
+    offsets = []
+    target = len(text) // count
+    parens = brackets = 0
+    for match in paren_pattern.finditer(text):
+        char = match.group()
+        if char == "(":
+            parens += 1
+        elif char == "[":
+            brackets += 1
+        elif char == ")" and parens > 0:
+            parens -= 1
+        elif char == "]" and brackets > 0:
+            brackets -= 1
+        else:
+            continue
+        if char in ")]" and parens == brackets == 0 and match.end() >= target * (len(offsets) + 1):
+            offsets.append(match.end())
+            if len(offsets) == count - 1:
+                break
+    return offsets
+
+def parse_chunk(text, line, col):
+    """
+    Parses the forms in `text`, which starts at `line` and `col` of the
+    whole file. Returns them marshalled, along with the error that
+    stopped parsing, if any.
+    """
+    scanner = Scanner(text, 0, line, col)
+    forms = []
+    for node in IterativeParser(scanner, lexer=scanner).iter_forms():
+        if node.is_err():
+            return marshal.dumps(encode(forms)), node
+        forms.append(node)
+    return marshal.dumps(encode(forms)), None
+
+def parse_parallel(text, workers=None, min_chunk_size=MIN_CHUNK_SIZE):
+    """
+    Parses the top-level forms of `text` in a pool of worker processes.
+    Returns the same forms as `Parser.iter_forms`, in order, with the
+    first error (if any) last.
+    """
+    workers = workers or os.cpu_count() or 1
+    count = max(1, min(workers * 4, len(text) // min_chunk_size))
+    bounds = [0, *split_offsets(text, count), len(text)]
+    chunks = []
+    line = col = 0
+    for start, end in zip(bounds, bounds[1:]):
+        chunks.append((text[start:end], line, col))
+        newlines = text.count("\n", start, end)
+        line += newlines
+        col = end - text.rfind("\n", start, end) - 1 if newlines else col + end - start
+    if len(chunks) == 1 or workers == 1:
+        results = [parse_chunk(*chunk) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            results = pool.map(parse_chunk, *zip(*chunks))
+    forms = []
+    for data, err in results:
+        forms.extend(decode(marshal.loads(data)))
+        if err is not None:
+            forms.append(err)
+            break
+    return forms
@@ -9,20 +9,18 @@ from copy import copy
 
 def parser_func(f):
     def inner(parser):
-        save = []
-        parser.save = save
+        state = parser.save_state()
         result = f(parser)
         if result.is_err():
-            while save:
-                parser.restore.append(save.pop())
+            parser.restore_state(state)
             return result
         return result
     return inner
 
 class Parser:
-    def __init__(self, source):
+    def __init__(self, source, lexer=None):
         self.source = source
-        self.lexer = Lexer(source)
+        self.lexer = Lexer(source) if lexer is None else lexer
         # Tokens saved for backtracking
         self.save = None
         # Tokens that were restored during backtracking
@@ -36,31 +34,70 @@ class Parser:
         self.lexer.skip_line()
         self.restore = []
 
+    def save_state(self):
+        save = []
+        self.save = save
+        return save
+
+    def restore_state(self, save):
+        while save:
+            self.restore.append(save.pop())
+
+    def iter_forms(self):
+        """
+        Yields top-level expressions until the end of the source, or
+        until an error, which is yielded last. Each form is only
+        referenced by the caller once it is yielded, and sources with a
+        `release` method are told which lines are no longer needed.
+        """
+        release = getattr(self.source, "release", None)
+        while True:
+            if (token := self.peek()).is_err():
+                yield token
+                return
+            elif token.type == TokenType.Eof:
+                return
+            if release is not None:
+                release(token.loc.line)
+            node = self.parse_expr()
+            self.save = None
+            yield node
+            if node.is_err():
+                return
+
     def next_token(self):
         if self.restore:
             return self.restore.pop()
         token = next(self.lexer)
         return token
 
+    def consume(self):
+        """
+        Like `next_token`, but the token is given back if the current
+        parser function fails.
+        """
+        token = self.next_token()
+        if not token.is_err():
+            self.save.append(token)
+        return token
+
     def peek(self):
         if not self.restore:
             self.restore.append(next(self.lexer))
         return self.restore[-1]
 
     def expect_type(self, type: TokenType):
-        token = self.next_token()
+        token = self.consume()
         if token.is_err():
             return token
-        self.save.append(token)
         if token.type != type:
             return ParserErr.ExpectedType(type=type, loc=token.loc)
         return token
 
     def expect_value(self, type: TokenType, value: str):
-        token = self.next_token()
+        token = self.consume()
         if token.is_err():
             return token
-        self.save.append(token)
         if token.type != type:
             return ParserErr.ExpectedType(type=type, loc=token.loc)
         elif token.value != value:
@@ -85,11 +122,10 @@ class Parser:
     def parse_type_atom(self):
         if self.peek().type != TokenType.Type:
             if self.peek().type != TokenType.Nil:
-                return ParserErr.ExpectedTypeExpr(loc=self.restore[-1].loc)
-            loc = self.restore[-1].loc
-            self.restore.pop()
+                return ParserErr.ExpectedTypeExpr(loc=self.peek().loc)
+            self.next_token()
             return Type.Nil()
-        result = self.restore.pop()
+        result = self.next_token()
         if result.value == "type":
             return Type.Type()
         elif result.value == "bool":
@@ -149,7 +185,6 @@ class Parser:
 
     @parser_func
     def parse_type(self):
-        loc = self.source.loc
         _type = None
         if self.peek().type == TokenType.Type or self.peek().type == TokenType.Nil:
             _type = self.parse_type_atom()
@@ -162,9 +197,7 @@ class Parser:
         elif self.peek().value == "(":
             _type = self.parse_type_paren()
         else:
-            if self.restore:
-                loc = self.restore[-1].loc
-            return ParserErr.ExpectedTypeExpr(loc=copy(loc))
+            return ParserErr.ExpectedTypeExpr(loc=copy(self.peek().loc))
         return _type
 
     @parser_func
@@ -208,7 +241,7 @@ class Parser:
         if (paren := self.expect_value(TokenType.Paren, "(")).is_err():
             return paren
         if self.peek().value == ")":
-            self.restore.pop()
+            self.next_token()
             return Node.List(values=[], loc=paren.loc)
         values = []
         while True:
@@ -223,7 +256,6 @@ class Parser:
 
     @parser_func
     def parse_expr(self):
-        loc = self.source.loc
         if self.peek().type == TokenType.Nil:
             return self.parse_nil()
         elif self.peek().value == "$":
@@ -240,8 +272,7 @@ class Parser:
             return self.parse_quote()
         elif self.peek().value == "(":
             return self.parse_list()
-        if self.restore:
-            loc = self.restore[-1].loc
+        loc = self.peek().loc
         if self.peek().type == TokenType.Type:
             return ParserErr.TypeKeyword(loc=copy(loc))
         return ParserErr.ExpectedExpr(loc=copy(loc))
@@ -0,0 +1,152 @@
+from reisp.ast.node import Node
+from reisp.lexer.token import TokenType
+from reisp.parser.parser import Parser
+from reisp.parser.parser_err import ParserErr
+from reisp.types.type import Type
+from copy import copy
+
+type_atoms = {
+    "type": Type.Type,
+    "bool": Type.Bool,
+    "int": Type.Int,
+    "str": Type.Str,
+    "sym": Type.Sym,
+    "func": Type.Func,
+    "any": Type.Any
+}
+
+def dispatch_key(token):
+    if token.type == TokenType.Paren or token.type == TokenType.Special:
+        return token.value
+    return token.type
+
+class PredictiveParser(Parser):
+    """
+    A `Parser` for the same grammar that picks a rule from a table
+    using the peeked token and never backtracks.
+
+    Note: unlike `Parser`, punctuation is only matched on `Paren`,
+    `Special` and `Quote` tokens, so a string literal such as "(" or
+    ")" is always parsed as a string.
+    """
+
+    def save_state(self):
+        return None
+
+    def restore_state(self, state):
+        pass
+
+    def consume(self):
+        return self.next_token()
+
+    def parse_expr(self):
+        token = self.peek()
+        if token.is_err():
+            return token
+        if (rule := expr_rules.get(dispatch_key(token))) is None:
+            if token.type == TokenType.Type:
+                return ParserErr.TypeKeyword(loc=copy(token.loc))
+            return ParserErr.ExpectedExpr(loc=copy(token.loc))
+        self.next_token()
+        return rule(self, token)
+
+    def parse_type(self):
+        token = self.peek()
+        if token.is_err():
+            return token
+        if (rule := type_rules.get(dispatch_key(token))) is None:
+            return ParserErr.ExpectedTypeExpr(loc=copy(token.loc))
+        self.next_token()
+        return rule(self, token)
+
+    def rule_nil(self, token):
+        return Node.Nil(loc=token.loc)
+
+    def rule_bool(self, token):
+        return Node.Bool(value=token.value == "true", loc=token.loc)
+
+    def rule_int(self, token):
+        return Node.Int(value=int(token.value), loc=token.loc)
+
+    def rule_str(self, token):
+        return Node.Str(value=token.value, loc=token.loc)
+
+    def rule_ident(self, token):
+        return Node.Ident(value=token.value, loc=token.loc)
+
+    def rule_quote(self, token):
+        if (result := self.parse_expr()).is_err():
+            return result
+        return Node.Quote(value=result, loc=token.loc)
+
+    def rule_type_expr(self, token):
+        if (value := self.parse_type()).is_err():
+            return value
+        return Node.Type(value=value, loc=token.loc)
+
+    def rule_list(self, token):
+        values = []
+        while True:
+            if (next_token := self.peek()).is_err():
+                return next_token
+            elif next_token.type == TokenType.Paren and next_token.value == ")":
+                self.next_token()
+                return Node.List(values=values, loc=token.loc)
+            elif (result := self.parse_expr()).is_err():
+                return result
+            values.append(result)
+
+    def rule_type_nil(self, token):
+        return Type.Nil()
+
+    def rule_type_atom(self, token):
+        return type_atoms[token.value]()
+
+    def rule_type_quote(self, token):
+        if (result := self.parse_type()).is_err():
+            return result
+        return Type.Quote(result)
+
+    def rule_type_list(self, token):
+        if (_type := self.parse_type()).is_err():
+            return _type
+        if (result := self.expect_value(TokenType.Paren, "]")).is_err():
+            return result
+        return Type.List(_type)
+
+    def rule_type_generic(self, token):
+        if (ident := self.expect_type(TokenType.Ident)).is_err():
+            return ident
+        return Type.Infer(ident.value)
+
+    def rule_type_paren(self, token):
+        if (_type := self.parse_type()).is_err():
+            return _type
+        while (token := self.peek()).type == TokenType.Special and token.value == "|":
+            self.next_token()
+            if (right_type := self.parse_type()).is_err():
+                return right_type
+            _type = Type.Union(_type, right_type)
+        if (result := self.expect_value(TokenType.Paren, ")")).is_err():
+            return result
+        return _type
+
+expr_rules = {
+    TokenType.Nil: PredictiveParser.rule_nil,
+    "$": PredictiveParser.rule_type_expr,
+    TokenType.Bool: PredictiveParser.rule_bool,
+    TokenType.Int: PredictiveParser.rule_int,
+    TokenType.Str: PredictiveParser.rule_str,
+    TokenType.Ident: PredictiveParser.rule_ident,
+    TokenType.Quote: PredictiveParser.rule_quote,
+    "(": PredictiveParser.rule_list
+}
+
+type_rules = {
+    TokenType.Type: PredictiveParser.rule_type_atom,
+    TokenType.Nil: PredictiveParser.rule_type_nil,
+    TokenType.Quote: PredictiveParser.rule_type_quote,
+    "[": PredictiveParser.rule_type_list,
+    "?": PredictiveParser.rule_type_generic,
+    "(": PredictiveParser.rule_type_paren
+}
@@ -0,0 +1,52 @@
+from reisp.parser.parser import Parser
+
+class StreamParser(Parser):
+    def __init__(self, stream, index=0):
+        """
+        A `Parser` that reads from a `TokenStream` by index. Backtracking
+        only has to move the index back, and the stream can be parsed
+        again from any token.
+        """
+        self.stream = stream
+        self.index = index
+        self.last = len(stream) - 1
+        self.lookahead = None
+        self.save = None
+        self.restore = []
+
+    def save_state(self):
+        return self.index
+
+    def restore_state(self, index):
+        if index != self.index:
+            self.index = index
+            self.lookahead = None
+
+    def is_eol(self):
+        if self.index == self.last:
+            return True
+        end = self.stream.ends[self.index - 1] if self.index else 0
+        return "\n" in self.stream.text[end:self.stream.starts[self.index]]
+
+    def skip_line(self):
+        end = self.stream.ends[self.index - 1] if self.index else 0
+        newline = self.stream.text.find("\n", end)
+        starts = self.stream.starts
+        while self.index < self.last and (newline == -1 or starts[self.index] <= newline):
+            self.index += 1
+        self.lookahead = None
+
+    def next_token(self):
+        token = self.peek()
+        if self.index < self.last:
+            self.index += 1
+            self.lookahead = None
+        return token
+
+    def consume(self):
+        return self.next_token()
+
+    def peek(self):
+        if self.lookahead is None:
+            self.lookahead = self.stream.get(self.index)
+        return self.lookahead
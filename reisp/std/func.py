@@ -1,10 +1,12 @@
 from reisp.ast.node_err import NodeErr
-from reisp.ast.node import Node
-from reisp.std.util import builtin_func
+from reisp.ast.node import Node, TailCall
+from reisp.std.util import builtin_func, tail_func
+from reisp.env.resolve import free_names
 
 @builtin_func("set", 2)
 def func_set(source, env, args):
     assert isinstance(args[0], Node.Ident)
+    # Identifiers are interned when they are lexed
     name = args[0].value
     if (value := args[1].eval(env)).is_err():
         return value
@@ -13,25 +15,51 @@ def func_set(source, env, args):
     env.add(name, value)
     return value
 
-@builtin_func("let", 2)
-def func_let(source, env, args):
+def eval_let(source, env, args, tail):
     assert isinstance(args[0], Node.List)
     if len(args[0].values) == 0:
         env.push()
-        result = args[1].eval(env)
+    else:
+        assert len(args[0].values) == 2
+        assert isinstance(args[0].values[0], Node.Ident)
+        name = args[0].values[0].value
+        if (value := args[0].values[1].eval(env)).is_err():
+            return value
+        env.push()
+        env.add(name, value)
+    result = args[1].eval_tail(env) if tail else args[1].eval(env)
+    # The function making a tail call pops this frame along with its own
+    if not isinstance(result, TailCall):
         env.pop()
-        return result
-    assert len(args[0].values) == 2
-    assert isinstance(args[0].values[0], Node.Ident)
-    name = args[0].values[0].value
-    if (value := args[0].values[1].eval(env)).is_err():
-        return value
-    env.push()
-    env.add(name, value)
-    result = args[1].eval(env)
-    env.pop()
     return result
 
+@builtin_func("let", 2)
+def func_let(source, env, args):
+    return eval_let(source, env, args, False)
+
+@tail_func(func_let)
+def func_let_tail(source, env, args):
+    return eval_let(source, env, args, True)
+
+def make_lambda(loc, params, body, env):
+    """
+    Makes the function for a `lambda`, capturing the values of the
+    variables its body uses that are bound locally in `env` right now.
+    Those are bound again around each call, so the function can still
+    use them after the frames they came from are gone.
+
+    Note: only the variables the body uses are kept, rather than the
+    frames they are in. Global names are looked up when the function
+    runs, so that it sees the ones defined after it.
+    """
+    free = []
+    captured = []
+    for name in free_names(params, body):
+        if (value := env.get_local(name)) is not None:
+            free.append(name)
+            captured.append(value)
+    return Node.UserFunc(loc, "", params, body, free=free, captured=captured)
+
 @builtin_func("lambda", 2)
 def func_lambda(source, env, args):
     assert isinstance(args[0], Node.List)
@@ -40,10 +68,26 @@ def func_lambda(source, env, args):
     for param in parameters:
         assert isinstance(param, Node.Ident)
         lambda_parameters.append(param.value)
-    return Node.UserFunc(source.loc, "", lambda_parameters, args[1])
+    return make_lambda(source.loc, lambda_parameters, args[1], env)
+
+def is_truthy(value):
+    return not isinstance(value, Node.Nil) and not (isinstance(value, Node.Bool) and not value.value)
+
+@builtin_func("if", 3)
+def func_if(source, env, args):
+    if (cond := args[0].eval(env)).is_err():
+        return cond
+    return args[1 if is_truthy(cond) else 2].eval(env)
+
+@tail_func(func_if)
+def func_if_tail(source, env, args):
+    if (cond := args[0].eval(env)).is_err():
+        return cond
+    return args[1 if is_truthy(cond) else 2].eval_tail(env)
 
 func_exports = [
     func_set,
     func_let,
-    func_lambda
+    func_lambda,
+    func_if
 ]
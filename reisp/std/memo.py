@@ -0,0 +1,98 @@
+from reisp.ast.node_err import NodeErr
+from reisp.ast.node import Node
+from reisp.std.util import builtin_func
+from collections import OrderedDict
+
+# The values that can be part of a key, by the field holding them
+hashable = {Node.Int: "value", Node.Bool: "value", Node.Str: "value", Node.Nil: None}
+
+def memo_key(values):
+    """
+    Returns a hashable key for a call with `values`, or None if any of
+    them is something other than an int, bool, string or nil.
+    """
+    key = []
+    for value in values:
+        if (cls := type(value)) not in hashable:
+            return None
+        key.append((cls, value.value if hashable[cls] else None))
+    return tuple(key)
+
+class Memo:
+    """
+    The results of a memoized function, keyed by its arguments and
+    holding up to `limit` of them. The least recently used result is
+    dropped first.
+
+    Note: scoping is dynamic, so only the arguments of a call are part
+    of the key. Memoizing a function that reads anything else it isn't
+    passed will return stale results.
+    """
+    def __init__(self, limit):
+        self.table = OrderedDict()
+        self.limit = limit
+        self.hits = 0
+        self.misses = 0
+
+    def call(self, values, compute):
+        if (key := memo_key(values)) is None:
+            return compute()
+        if (result := self.table.get(key)) is not None:
+            self.table.move_to_end(key)
+            self.hits += 1
+            return result
+        self.misses += 1
+        result = compute()
+        # Errors aren't cached, as they may come from something other
+        # than the arguments
+        if not result.is_err():
+            self.table[key] = result
+            while len(self.table) > self.limit:
+                self.table.popitem(last=False)
+        return result
+
+    def clear(self):
+        self.table.clear()
+        self.hits = 0
+        self.misses = 0
+
+def memoized(source, env, args):
+    # Returns the memoized function in `args[0]`, or an error
+    if (func := args[0].eval(env)).is_err():
+        return func
+    elif not isinstance(func, Node.UserFunc) or func.memo is None:
+        return NodeErr.NotMemoized(args[0].loc, func)
+    return func
+
+@builtin_func("memo", 2)
+def func_memo(source, env, args):
+    if (func := args[0].eval(env)).is_err():
+        return func
+    if (limit := args[1].eval(env)).is_err():
+        return limit
+    if not isinstance(func, Node.UserFunc):
+        return NodeErr.NotUserFunc(args[0].loc, func)
+    if not isinstance(limit, Node.Int) or limit.value < 0:
+        return NodeErr.InvalidLimit(args[1].loc, limit)
+    return Node.UserFunc(func.loc, func.name, func.args, func.body, Memo(limit.value), func.free, func.captured)
+
+@builtin_func("memo-clear", 1)
+def func_memo_clear(source, env, args):
+    if (func := memoized(source, env, args)).is_err():
+        return func
+    func.memo.clear()
+    return Node.Nil(source.loc)
+
+@builtin_func("memo-stats", 1)
+def func_memo_stats(source, env, args):
+    if (func := memoized(source, env, args)).is_err():
+        return func
+    memo = func.memo
+    return Node.List(source.loc, [Node.Int(source.loc, count)
+                                  for count in [memo.hits, memo.misses, len(memo.table), memo.limit]])
+
+memo_exports = [
+    func_memo,
+    func_memo_clear,
+    func_memo_stats
+]
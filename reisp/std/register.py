@@ -1,7 +1,14 @@
 from reisp.std.operators import operator_exports
 from reisp.std.func import func_exports
+from reisp.std.memo import memo_exports
+
+try:
+    from reisp.std.vector import vector_exports
+except ImportError:
+    # Vectors are backed by NumPy, so they are only there with it
+    vector_exports = []
 
 def register_exports(env):
-    all_exports = [*operator_exports, *func_exports]
+    all_exports = [*operator_exports, *func_exports, *memo_exports, *vector_exports]
     for export in all_exports:
         env.add(export.name, export)
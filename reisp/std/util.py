@@ -1,9 +1,22 @@
 from reisp.loc import Loc
 from reisp.ast.node import Node
+from reisp.symbol import symbol
 
 def builtin_func(name, arity):
     def inner(f):
         # TODO: Is there a better way to handle the location of a
         # builtin function?
-        return Node.BuiltinFunc(Loc(-1, -1), name, arity, f)
+        return Node.BuiltinFunc(Loc(-1, -1), symbol(name), arity, f)
+    return inner
+
+def tail_func(builtin):
+    """
+    Registers the decorated function as the way `builtin` is evaluated
+    in tail position. It takes the same arguments as the builtin, but
+    evaluates its own tail position with `eval_tail`, and can leave
+    frames it pushed in place when that returns a `TailCall`.
+    """
+    def inner(f):
+        builtin.tail = f
+        return f
     return inner
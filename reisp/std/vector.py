@@ -0,0 +1,286 @@
+from reisp.ast.node_err import NodeErr
+from reisp.ast.node import Node
+from reisp.std.util import builtin_func
+from reisp.std.func import is_truthy
+from reisp.std.operators import (op_not, op_plus, op_minus, op_mult, op_div, op_mod, op_eq,
+                                 op_neq, op_less, op_greater, op_leq, op_geq)
+import numpy as np
+
+# The operators that run over whole vectors at once, keyed by name
+binary_ufuncs = {builtin.name: (builtin, ufunc) for builtin, ufunc in [
+    (op_plus, np.add),
+    (op_minus, np.subtract),
+    (op_mult, np.multiply),
+    (op_div, np.floor_divide),
+    (op_mod, np.mod),
+    (op_eq, np.equal),
+    (op_neq, np.not_equal),
+    (op_less, np.less),
+    (op_greater, np.greater),
+    (op_leq, np.less_equal),
+    (op_geq, np.greater_equal)
+]}
+arithmetic = {np.add, np.subtract, np.multiply, np.floor_divide, np.mod}
+# The operators that reduce in one call
+reducible = {np.add, np.subtract, np.multiply}
+
+# The ints an int64 array can hold. A vector holding any int outside of
+# them holds Python ints instead (dtype=object), so that nothing wraps.
+INT64_MIN = -(1 << 63)
+INT64_MAX = (1 << 63) - 1
+# Results worked out as floats below this surely fit in an int64,
+# however far off the floats are
+SAFE_BOUND = float(1 << 62)
+
+def ufunc_for(func):
+    if not isinstance(func, Node.BuiltinFunc) or func.name not in binary_ufuncs:
+        return None
+    builtin, ufunc = binary_ufuncs[func.name]
+    return ufunc if func is builtin else None
+
+def eval_args(env, args):
+    # Returns the list of argument values, or an error
+    values = []
+    for arg in args:
+        if (value := arg.eval(env)).is_err():
+            return value
+        values.append(value)
+    return values
+
+def is_wide(x):
+    # Whether `x`, an array or an int, holds an int that an int64 can't
+    if isinstance(x, np.ndarray):
+        return x.dtype == object
+    return not INT64_MIN <= x <= INT64_MAX
+
+def int_array(values):
+    """
+    Returns an array of the ints in `values`, as int64 if they all fit
+    and as Python ints otherwise.
+    """
+    values = list(values)
+    if all(INT64_MIN <= x <= INT64_MAX for x in values):
+        return np.array(values, dtype=np.int64)
+    return np.array(values, dtype=object)
+
+def exact(apply, *operands):
+    """
+    Returns `apply` called on the int `operands`, which are arrays or
+    ints, without wrapping around. Unless the result surely fits, it is
+    worked out with Python ints.
+
+    Note: NumPy ints wrap silently, so the result is first worked out
+    with floats, which are only ever a little off.
+    """
+    if not any(map(is_wide, operands)):
+        with np.errstate(all="ignore"):
+            approx = apply(*[np.asarray(x, dtype=np.float64) for x in operands])
+        if np.all(np.abs(approx) < SAFE_BOUND):
+            return apply(*operands)
+    result = apply(*[np.asarray(x, dtype=object) for x in operands])
+    return int_array(result.tolist()) if isinstance(result, np.ndarray) else result
+
+def element(loc, x):
+    if isinstance(x, (bool, np.bool_)):
+        return Node.Bool(loc, bool(x))
+    return Node.Int(loc, int(x))
+
+def from_nodes(loc, nodes, source):
+    """
+    Returns a vector holding the values of `nodes`, which must all be
+    ints or all be bools, or an error pointing at `source`.
+    """
+    if all(isinstance(node, Node.Int) for node in nodes):
+        return Node.Vector(loc, int_array(node.value for node in nodes))
+    elif all(isinstance(node, Node.Bool) for node in nodes):
+        return Node.Vector(loc, np.array([node.value for node in nodes], dtype=np.bool_))
+    return NodeErr.MixedVector(source.loc, source)
+
+def operand(value, arg, numeric):
+    # Returns the array or scalar for one side of an elementwise call,
+    # or an error
+    if isinstance(value, Node.Vector):
+        array = value.value
+    elif isinstance(value, (Node.Int, Node.Bool)):
+        array = value.value
+    else:
+        return NodeErr.NotVector(arg.loc, value)
+    # NumPy adds bools as a logical or, where the operators add them as
+    # ints
+    if numeric and isinstance(array, np.ndarray) and array.dtype.kind == "b":
+        array = array.astype(np.int64)
+    return array
+
+def call_each(source, env, func, columns):
+    """
+    Calls `func` on each row of elements in `columns` and returns the
+    vector of its results, or the first error.
+    """
+    results = []
+    for row in zip(*columns):
+        if (result := func.call(source, env, [element(source.loc, x) for x in row])).is_err():
+            return result
+        results.append(result)
+    return from_nodes(source.loc, results, source)
+
+@builtin_func("vec", 1)
+def func_vec(source, env, args):
+    if (value := args[0].eval(env)).is_err():
+        return value
+    if isinstance(value, Node.Vector):
+        return value
+    elif not isinstance(value, Node.List):
+        return NodeErr.NotVector(args[0].loc, value)
+    return from_nodes(source.loc, value.values, args[0])
+
+@builtin_func("vec-range", 2)
+def func_range(source, env, args):
+    if not isinstance(values := eval_args(env, args), list):
+        return values
+    start, end = values
+    if is_wide(start.value) or is_wide(end.value):
+        return Node.Vector(source.loc, int_array(range(start.value, end.value)))
+    return Node.Vector(source.loc, np.arange(start.value, end.value, dtype=np.int64))
+
+@builtin_func("vec-map", 2)
+def func_map(source, env, args):
+    if not isinstance(values := eval_args(env, args), list):
+        return values
+    func, vector = values
+    if not func.is_callable():
+        return NodeErr.NotCallable(args[0].loc, func)
+    elif not isinstance(vector, Node.Vector):
+        return NodeErr.NotVector(args[1].loc, vector)
+    if func is op_not:
+        return Node.Vector(source.loc, np.logical_not(vector.value))
+    return call_each(source, env, func, [vector.value])
+
+@builtin_func("vec-map2", 3)
+def func_map2(source, env, args):
+    if not isinstance(values := eval_args(env, args), list):
+        return values
+    func, left, right = values
+    if not func.is_callable():
+        return NodeErr.NotCallable(args[0].loc, func)
+    ufunc = ufunc_for(func)
+    numeric = ufunc in arithmetic
+    if not isinstance(left_array := operand(left, args[1], numeric), (np.ndarray, int)):
+        return left_array
+    if not isinstance(right_array := operand(right, args[2], numeric), (np.ndarray, int)):
+        return right_array
+    left_len, right_len = np.shape(left_array), np.shape(right_array)
+    if left_len and right_len and left_len != right_len:
+        return NodeErr.LengthMismatch(source.loc, left_len[0], right_len[0])
+    elif not left_len and not right_len:
+        return NodeErr.NotVector(args[1].loc, left)
+    if ufunc is not None:
+        if (ufunc is np.floor_divide or ufunc is np.mod) and np.any(np.equal(right_array, 0)):
+            return NodeErr.ZeroDiv(args[2].loc)
+        elif numeric:
+            return Node.Vector(source.loc, exact(ufunc, left_array, right_array))
+        return Node.Vector(source.loc, ufunc(left_array, right_array))
+    left_array, right_array = np.broadcast_arrays(left_array, right_array)
+    return call_each(source, env, func, [left_array, right_array])
+
+@builtin_func("vec-reduce", 2)
+def func_reduce(source, env, args):
+    if not isinstance(values := eval_args(env, args), list):
+        return values
+    func, vector = values
+    if not func.is_callable():
+        return NodeErr.NotCallable(args[0].loc, func)
+    elif not isinstance(vector, Node.Vector):
+        return NodeErr.NotVector(args[1].loc, vector)
+    array = vector.value
+    if (ufunc := ufunc_for(func)) in reducible:
+        if array.dtype.kind == "b":
+            array = array.astype(np.int64)
+        # Subtraction has no identity to reduce an empty vector to
+        if len(array) or ufunc is not np.subtract:
+            return Node.Int(source.loc, int(exact(ufunc.reduce, array)))
+    if not len(array):
+        return NodeErr.EmptyVector(source.loc)
+    result = element(source.loc, array[0])
+    for x in array[1:]:
+        if (result := func.call(source, env, [result, element(source.loc, x)])).is_err():
+            return result
+    return result
+
+@builtin_func("vec-filter", 2)
+def func_filter(source, env, args):
+    if not isinstance(values := eval_args(env, args), list):
+        return values
+    test, vector = values
+    if not isinstance(vector, Node.Vector):
+        return NodeErr.NotVector(args[1].loc, vector)
+    if isinstance(test, Node.Vector):
+        if test.value.dtype.kind != "b":
+            return NodeErr.MixedVector(args[0].loc, test)
+        elif len(test.value) != len(vector.value):
+            return NodeErr.LengthMismatch(source.loc, len(test.value), len(vector.value))
+        mask = test.value
+    elif test is op_not:
+        mask = np.logical_not(vector.value)
+    elif test.is_callable():
+        results = []
+        for x in vector.value:
+            if (result := test.call(source, env, [element(source.loc, x)])).is_err():
+                return result
+            results.append(is_truthy(result))
+        mask = np.array(results, dtype=np.bool_)
+    else:
+        return NodeErr.NotCallable(args[0].loc, test)
+    return Node.Vector(source.loc, vector.value[mask])
+
+@builtin_func("vec-slice", 3)
+def func_slice(source, env, args):
+    if not isinstance(values := eval_args(env, args), list):
+        return values
+    vector, start, end = values
+    if not isinstance(vector, Node.Vector):
+        return NodeErr.NotVector(args[0].loc, vector)
+    return Node.Vector(source.loc, vector.value[start.value:end.value])
+
+@builtin_func("vec-get", 2)
+def func_get(source, env, args):
+    if not isinstance(values := eval_args(env, args), list):
+        return values
+    vector, index = values
+    if not isinstance(vector, Node.Vector):
+        return NodeErr.NotVector(args[0].loc, vector)
+    elif not -len(vector.value) <= index.value < len(vector.value):
+        return NodeErr.IndexOutOfRange(args[1].loc, index.value, len(vector.value))
+    return element(source.loc, vector.value[index.value])
+
+def aggregate(name, reduce, empty_ok):
+    @builtin_func(name, 1)
+    def inner(source, env, args):
+        if (vector := args[0].eval(env)).is_err():
+            return vector
+        elif not isinstance(vector, Node.Vector):
+            return NodeErr.NotVector(args[0].loc, vector)
+        elif not empty_ok and not len(vector.value):
+            return NodeErr.EmptyVector(source.loc)
+        return element(source.loc, reduce(vector.value))
+    return inner
+
+func_len = aggregate("vec-len", len, True)
+# Summing bools counts the true ones
+func_sum = aggregate("vec-sum", lambda array: int(exact(np.add.reduce, array)), True)
+func_min = aggregate("vec-min", np.min, False)
+func_max = aggregate("vec-max", np.max, False)
+
+vector_exports = [
+    func_vec,
+    func_range,
+    func_map,
+    func_map2,
+    func_reduce,
+    func_filter,
+    func_slice,
+    func_get,
+    func_len,
+    func_sum,
+    func_min,
+    func_max
+]
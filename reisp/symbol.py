@@ -0,0 +1,10 @@
+from sys import intern
+
+def symbol(name):
+    """
+    Returns the canonical copy of the identifier `name`. Every
+    identifier is passed through here once when it is lexed or
+    registered, so environment lookups compare keys by identity and
+    reuse their cached hashes.
+    """
+    return intern(name)
@@ -0,0 +1,187 @@
+from reisp.ast.node import Node
+from reisp.ast.node_err import NodeErr, EvalError
+from reisp.std.operators import (op_not, op_plus, op_minus, op_mult, op_div, op_mod, op_eq,
+                                 op_neq, op_less, op_greater, op_leq, op_geq)
+from reisp.std.func import func_set, func_let, func_lambda, func_if
+from reisp.compiler.fold import merge_deps
+from reisp.types.type import Type, members, union
+from reisp.symbol import symbol
+import operator
+
+def plain(op):
+    return lambda node: op
+
+def plain_div(node):
+    loc = node.values[2].loc
+    def div(left, right):
+        if right == 0:
+            raise EvalError(NodeErr.ZeroDiv(loc))
+        return left // right
+    return div
+
+# The operators, keyed by name, with the type their operands must have
+# (None for any), the type of their result, and a function making the
+# plain Python version of a call
+operators = {builtin.name: (builtin, operand, result, make) for builtin, operand, result, make in [
+    (op_not, None, Type.Bool(), plain(operator.not_)),
+    (op_plus, Type.Int(), Type.Int(), plain(operator.add)),
+    (op_minus, Type.Int(), Type.Int(), plain(operator.sub)),
+    (op_mult, Type.Int(), Type.Int(), plain(operator.mul)),
+    (op_div, Type.Int(), Type.Int(), plain_div),
+    (op_mod, Type.Int(), Type.Int(), plain(operator.mod)),
+    (op_eq, None, Type.Bool(), plain(operator.eq)),
+    (op_neq, None, Type.Bool(), plain(operator.ne)),
+    (op_less, Type.Int(), Type.Bool(), plain(operator.lt)),
+    (op_greater, Type.Int(), Type.Bool(), plain(operator.gt)),
+    (op_leq, Type.Int(), Type.Bool(), plain(operator.le)),
+    (op_geq, Type.Int(), Type.Bool(), plain(operator.ge))
+]}
+
+# The types of the operands an operator call can be computed from
+# without boxing them
+plain_types = {Type.Int(), Type.Bool()}
+
+class Checker:
+    def __init__(self, env):
+        self.env = env
+        # What each inferred type was found to be
+        self.found = {}
+        self.count = 0
+        # How many lambdas the node being checked is in
+        self.in_func = 0
+
+    def fresh(self):
+        self.count += 1
+        return Type.Infer(f"t{self.count}")
+
+    def resolve(self, _type):
+        while isinstance(_type, Type.Infer) and _type in self.found:
+            _type = self.found[_type]
+        if isinstance(_type, Type.Union):
+            return union(self.resolve(_type.left), self.resolve(_type.right))
+        return _type
+
+    def expect(self, node, found, expected):
+        """
+        Raises a type error for `node`, which has type `found`, unless
+        it could be of type `expected`. An inferred type that isn't
+        known yet is taken to be `expected` from then on.
+        """
+        found = self.resolve(found)
+        if isinstance(found, Type.Infer):
+            self.found[found] = expected
+            return
+        possible = members(found)
+        if (found is Type.Any() or expected in possible
+                or any(isinstance(_type, Type.Infer) for _type in possible)):
+            return
+        raise EvalError(NodeErr.TypeMismatch(node.loc, expected, found))
+
+    def check(self, node, scope):
+        """
+        Returns a copy of `node` checked for type errors, along with its
+        type. `scope` maps the names bound by enclosing `let`s and
+        parameters of the same function to their types.
+        """
+        if isinstance(node, Node.Ident):
+            if (_type := scope.get(node.value)) is not None:
+                return node, _type
+            # Scoping is dynamic, so only a top-level form is known to
+            # see the globals as they are now
+            elif self.in_func or (value := self.env.get(node.value)) is None:
+                return node, Type.Any()
+            return node, value.type()
+        elif isinstance(node, Node.Folded):
+            return node, node.value.type()
+        elif not isinstance(node, Node.List) or not node.values:
+            return node, node.type()
+        head = node.values[0]
+        if isinstance(head, Node.Ident) and head.value not in scope:
+            builtin, check = forms.get(head.value, (None, None))
+            if (check is not None and self.env.get(head.value) is builtin
+                    and builtin.arity == len(node.values) - 1):
+                return check(self, node, scope)
+        values = [self.check(value, scope)[0] for value in node.values]
+        return Node.List(node.loc, values), Type.Any()
+
+    def check_operator(self, node, scope):
+        name = node.values[0].value
+        builtin, operand, result, make = operators[name]
+        values = [node.values[0]]
+        is_plain = True
+        for arg in node.values[1:]:
+            arg, _type = self.check(arg, scope)
+            if operand is not None:
+                self.expect(arg, _type, operand)
+            is_plain = is_plain and self.resolve(_type) in plain_types
+            values.append(arg)
+        call = Node.List(node.loc, values)
+        if not is_plain:
+            return call, result
+        deps = merge_deps(*(arg.deps for arg in values[1:] if isinstance(arg, Node.Checked)), [(name, builtin)])
+        return Node.Checked(node.loc, result, deps, call, make(call)), result
+
+    def check_set(self, node, scope):
+        head, name, value = node.values
+        value, _type = self.check(value, scope)
+        return Node.List(node.loc, [head, name, value]), _type
+
+    def check_let(self, node, scope):
+        head, binding, body = node.values
+        if not isinstance(binding, Node.List):
+            return node, Type.Any()
+        elif not binding.values:
+            body, _type = self.check(body, scope)
+            return Node.List(node.loc, [head, binding, body]), _type
+        elif len(binding.values) != 2 or not isinstance(binding.values[0], Node.Ident):
+            return node, Type.Any()
+        name, value = binding.values
+        value, value_type = self.check(value, scope)
+        body, _type = self.check(body, {**scope, symbol(name.value): value_type})
+        return Node.List(node.loc, [head, Node.List(binding.loc, [name, value]), body]), _type
+
+    def check_lambda(self, node, scope):
+        head, params, body = node.values
+        if not isinstance(params, Node.List) or not all(isinstance(param, Node.Ident) for param in params.values):
+            return node, Type.Func()
+        # Like `fold_lambda`, nothing from around the lambda carries over
+        # into the body
+        self.in_func += 1
+        body, _ = self.check(body, {symbol(param.value): self.fresh() for param in params.values})
+        self.in_func -= 1
+        return Node.List(node.loc, [head, params, body]), Type.Func()
+
+    def check_if(self, node, scope):
+        head, cond, then, otherwise = node.values
+        cond, _ = self.check(cond, scope)
+        then, then_type = self.check(then, scope)
+        otherwise, otherwise_type = self.check(otherwise, scope)
+        return Node.List(node.loc, [head, cond, then, otherwise]), union(then_type, otherwise_type)
+
+# The builtins the checker knows the types of, keyed by name
+forms = {builtin.name: (builtin, check) for builtin, check in [
+    *((builtin, Checker.check_operator) for builtin, *_ in operators.values()),
+    (func_set, Checker.check_set),
+    (func_let, Checker.check_let),
+    (func_lambda, Checker.check_lambda),
+    (func_if, Checker.check_if)
+]}
+
+def check(node, env):
+    """
+    Checks the types in `node` before it runs, and returns the first
+    type error or a copy of `node` in which the operator calls whose
+    operands are all ints or bools are `Node.Checked`. The parameters
+    of a function get the types their uses call for.
+
+    Note: scoping is dynamic, so the checker assumes that the names of
+    builtins still refer to them when the code runs, and that the
+    callers of a function pass what its body expects. The checked calls
+    make sure of the first before taking their fast path. They compute
+    exactly what the builtins would, so an argument of another type
+    gives the same result either way.
+    """
+    try:
+        return Checker(env).check(node, {})[0]
+    except EvalError as e:
+        return e.err
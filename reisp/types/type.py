@@ -1,11 +1,58 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
 
 class BaseType:
+    """
+    Types are hash-consed: constructing a type returns the one canonical
+    instance with the same class and fields, so types can be compared
+    with `is`.
+
+    Note: subclasses must be dataclasses with `eq=False`, which keeps
+    the identity based `__eq__` and `__hash__`.
+    """
+    instances = {}
+
+    def __new__(cls, *args, **kwargs):
+        if kwargs:
+            args += tuple(kwargs[field.name] for field in fields(cls)[len(args):])
+        key = (cls, *args)
+        if (instance := BaseType.instances.get(key)) is None:
+            instance = BaseType.instances[key] = super().__new__(cls)
+        return instance
+
+    def __reduce__(self):
+        return (type(self), tuple(getattr(self, field.name) for field in fields(self)))
+
     def is_err(self):
         return False
 
 def resolve_type(values):
-    return Type.Any()
+    """
+    Returns the type of the elements of a list holding `values`.
+    """
+    if not values:
+        return Type.Any()
+    result = values[0].type()
+    for value in values[1:]:
+        result = union(result, value.type())
+    return result
+
+def members(_type):
+    if isinstance(_type, Type.Union):
+        return members(_type.left) | members(_type.right)
+    return {_type}
+
+def union(left, right):
+    """
+    Returns the type of a value that is either `left` or `right`, with
+    each type in it only once.
+    """
+    if left is Type.Any() or right is Type.Any():
+        return Type.Any()
+    elif right in members(left):
+        return left
+    elif left in members(right):
+        return right
+    return Type.Union(left, right)
 
 type_keywords = [
     "nil",
@@ -19,63 +66,63 @@ type_keywords = [
 ]
 
 class Type:
-    @dataclass
+    @dataclass(eq=False)
     class Nil(BaseType):
         def show(self):
             return "nil"
 
-    @dataclass
+    @dataclass(eq=False)
     class Type(BaseType):
         def show(self):
             return "type"
 
-    @dataclass
+    @dataclass(eq=False)
     class Bool(BaseType):
         def show(self):
             return "bool"
 
-    @dataclass
+    @dataclass(eq=False)
     class Int(BaseType):
         def show(self):
             return "int"
 
-    @dataclass
+    @dataclass(eq=False)
     class Str(BaseType):
         def show(self):
             return "str"
 
-    @dataclass
+    @dataclass(eq=False)
     class Sym(BaseType):
         def show(self):
             return "sym"
 
-    @dataclass
+    @dataclass(eq=False)
     class Func(BaseType):
         def show(self):
             return "func"
 
-    @dataclass
+    @dataclass(eq=False)
     class Quote(BaseType):
         subtype: BaseType
 
         def show(self):
             return "'" + self.subtype.show()
 
-    @dataclass
+    @dataclass(eq=False)
     class List(BaseType):
         subtype: BaseType
 
         def show(self):
             return "[" + self.subtype.show() + "]"
 
-    @dataclass
+    @dataclass(eq=False)
     class Infer(BaseType):
         name: str
 
         def show(self):
             return "?" + self.name
 
-    @dataclass
+    @dataclass(eq=False)
     class Union(BaseType):
         left: BaseType
         right: BaseType
@@ -83,7 +130,7 @@ class Type:
         def show(self):
             return self.left.show() + " | " + self.right.show()
 
-    @dataclass
+    @dataclass(eq=False)
     class Any(BaseType):
         def show(self):
             return "any"
@@ -0,0 +1,76 @@
+from reisp.cache.ast_cache import encode, decode
+from reisp.symbol import symbol
+from dataclasses import dataclass, field
+from typing import List as TList
+from array import array
+import marshal
+
+# Bump this whenever the instruction set or the layout below changes
+CODE_VERSION = 3
+
+@dataclass
+class Site:
+    # The call being made, used when the tree-walker has to make it
+    node: 'BaseNode'
+    # The instruction after the call
+    end: int
+    # The builtin the inline code was compiled for, if any
+    builtin: str
+
+@dataclass
+class Code:
+    name: str
+    params: TList[str]
+    # The node this was compiled from, which becomes the body of the
+    # functions made from nested code
+    source: 'BaseNode'
+    # Pairs of opcode and argument
+    instructions: array = field(default_factory=lambda: array("I"))
+    # The line and column of each instruction
+    lines: array = field(default_factory=lambda: array("i"))
+    cols: array = field(default_factory=lambda: array("i"))
+    consts: list = field(default_factory=list)
+    names: TList[str] = field(default_factory=list)
+    sites: TList[Site] = field(default_factory=list)
+    codes: TList['Code'] = field(default_factory=list)
+
+def to_tuple(code):
+    return (
+        code.name,
+        code.params,
+        encode([code.source]),
+        code.instructions.tobytes(),
+        code.lines.tobytes(),
+        code.cols.tobytes(),
+        encode(code.consts),
+        code.names,
+        encode([site.node for site in code.sites]),
+        [site.end for site in code.sites],
+        [site.builtin for site in code.sites],
+        [to_tuple(nested) for nested in code.codes]
+    )
+
+def from_tuple(data):
+    name, params, source, instructions, lines, cols, consts, names, nodes, ends, builtins, codes = data
+    code = Code(name, [symbol(param) for param in params], decode(source)[0])
+    code.instructions.frombytes(instructions)
+    code.lines.frombytes(lines)
+    code.cols.frombytes(cols)
+    code.consts = decode(consts)
+    code.names = [symbol(name) for name in names]
+    code.sites = [Site(*site) for site in zip(decode(nodes), ends, builtins)]
+    code.codes = [from_tuple(nested) for nested in codes]
+    return code
+
+def dumps(code):
+    return marshal.dumps((CODE_VERSION, to_tuple(code)))
+
+def loads(data):
+    """
+    Reads a `Code` written by `dumps`. Raises ValueError if it was
+    written for a different instruction set.
+    """
+    version, data = marshal.loads(data)
+    if version != CODE_VERSION:
+        raise ValueError(f"Unsupported code version {version}")
+    return from_tuple(data)
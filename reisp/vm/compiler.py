@@ -0,0 +1,155 @@
+from reisp.ast.node import Node
+from reisp.std.operators import (op_not, op_plus, op_minus, op_mult, op_div, op_mod, op_eq,
+                                 op_neq, op_less, op_greater, op_leq, op_geq)
+from reisp.std.func import func_set, func_let, func_lambda, func_if
+from reisp.symbol import symbol
+from reisp.vm.opcode import Op
+from reisp.vm.code import Code, Site
+
+# The operators compiled to a single instruction, keyed by name
+operator_ops = {builtin.name: (builtin, op) for builtin, op in [
+    (op_not, Op.Not),
+    (op_plus, Op.Add),
+    (op_minus, Op.Sub),
+    (op_mult, Op.Mul),
+    (op_div, Op.Div),
+    (op_mod, Op.Mod),
+    (op_eq, Op.Eq),
+    (op_neq, Op.Neq),
+    (op_less, Op.Less),
+    (op_greater, Op.Greater),
+    (op_leq, Op.Leq),
+    (op_geq, Op.Geq)
+]}
+
+# Every builtin that can be compiled inline, keyed by name
+inline_builtins = {name: builtin for name, (builtin, _) in operator_ops.items()}
+inline_builtins.update((builtin.name, builtin) for builtin in [func_set, func_let, func_lambda, func_if])
+
+class Compiler:
+    def __init__(self, code, in_func):
+        self.code = code
+        # Whether the code is a function body, where tail calls replace
+        # the current call
+        self.in_func = in_func
+        self.consts = {}
+        self.names = {}
+
+    def emit(self, op, arg, loc):
+        self.code.instructions.append(op)
+        self.code.instructions.append(arg)
+        self.code.lines.append(loc.line)
+        self.code.cols.append(loc.col)
+        return len(self.code.instructions) - 2
+
+    def const(self, value):
+        # Nodes can't be hashed, so constants are only shared by identity
+        if (index := self.consts.get(id(value))) is None:
+            index = self.consts[id(value)] = len(self.code.consts)
+            self.code.consts.append(value)
+        return index
+
+    def name(self, name):
+        if (index := self.names.get(name)) is None:
+            index = self.names[name] = len(self.code.names)
+            self.code.names.append(name)
+        return index
+
+    def compile(self, node, tail=False):
+        if isinstance(node, Node.Ident):
+            self.emit(Op.Load, self.name(node.value), node.loc)
+        elif isinstance(node, Node.Quote):
+            self.emit(Op.Const, self.const(node.eval(None)), node.loc)
+        elif isinstance(node, Node.List) and node.values:
+            self.compile_call(node, tail and self.in_func)
+        elif isinstance(node, (Node.Folded, Node.Checked)):
+            # The operators are already compiled inline behind a check
+            self.compile(node.original, tail)
+        else:
+            self.emit(Op.Const, self.const(node), node.loc)
+
+    def compile_call(self, node, tail):
+        head = node.values[0]
+        args = node.values[1:]
+        builtin = ""
+        if isinstance(head, Node.Ident) and self.can_inline(head.value, args):
+            builtin = head.value
+        site = len(self.code.sites)
+        self.code.sites.append(Site(node, -1, builtin))
+        self.compile(head)
+        self.emit(Op.Callee, site, head.loc)
+        if builtin in operator_ops:
+            for arg in args:
+                self.compile(arg)
+            self.emit(operator_ops[builtin][1], site, node.loc)
+        elif builtin == "set":
+            self.compile(args[1])
+            self.emit(Op.Set, self.name(symbol(args[0].value)), node.loc)
+        elif builtin == "let":
+            self.compile_let(node, *args, tail)
+        elif builtin == "lambda":
+            self.compile_lambda(node, *args)
+        elif builtin == "if":
+            self.compile_if(node, *args, tail)
+        else:
+            for arg in args:
+                self.compile(arg)
+            self.emit(Op.TailCall if tail else Op.Call, len(args), node.loc)
+        self.code.sites[site].end = len(self.code.instructions)
+
+    def can_inline(self, name, args):
+        """
+        Checks whether a call to the builtin `name` with `args` has the
+        shape its inline code expects. Anything else is left to the
+        builtin itself, so it reports (or asserts on) bad calls as usual.
+        """
+        if (builtin := inline_builtins.get(name)) is None or builtin.arity != len(args):
+            return False
+        if name == "set":
+            return isinstance(args[0], Node.Ident)
+        elif name == "let":
+            binding = args[0]
+            return isinstance(binding, Node.List) and (not binding.values or (
+                len(binding.values) == 2 and isinstance(binding.values[0], Node.Ident)))
+        elif name == "lambda":
+            params = args[0]
+            return isinstance(params, Node.List) and all(isinstance(param, Node.Ident) for param in params.values)
+        return True
+
+    def compile_let(self, node, binding, body, tail):
+        if binding.values:
+            self.compile(binding.values[1])
+            self.emit(Op.PushFrame, 0, node.loc)
+            self.emit(Op.Bind, self.name(symbol(binding.values[0].value)), binding.loc)
+        else:
+            self.emit(Op.PushFrame, 0, node.loc)
+        self.compile(body, tail)
+        self.emit(Op.PopFrame, 0, node.loc)
+
+    def compile_if(self, node, cond, then, otherwise, tail):
+        self.compile(cond)
+        jump_else = self.emit(Op.JumpIfFalse, 0, node.loc)
+        self.compile(then, tail)
+        jump_end = self.emit(Op.Jump, 0, node.loc)
+        self.code.instructions[jump_else + 1] = len(self.code.instructions)
+        self.compile(otherwise, tail)
+        self.code.instructions[jump_end + 1] = len(self.code.instructions)
+
+    def compile_lambda(self, node, params, body):
+        nested = compile_code(body, "", [symbol(param.value) for param in params.values])
+        self.emit(Op.Lambda, len(self.code.codes), node.loc)
+        self.code.codes.append(nested)
+
+def compile_code(node, name="<form>", params=None):
+    """
+    Compiles `node` into a `Code` that leaves the value of `node` on the
+    stack and returns. The calls to the builtins the VM knows are
+    compiled inline, behind a check that the name still refers to that
+    builtin when the code runs. `params` is given for a function body,
+    whose calls in tail position become tail calls.
+    """
+    code = Code(name, list(params or []), node)
+    compiler = Compiler(code, params is not None)
+    compiler.compile(node, True)
+    compiler.emit(Op.Return, 0, node.loc)
+    return code
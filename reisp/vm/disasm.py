@@ -0,0 +1,35 @@
+from reisp.vm.opcode import Op
+
+def describe(code, op, arg):
+    if op == Op.Const:
+        return code.consts[arg].show()
+    elif op in (Op.Load, Op.Set, Op.Bind):
+        return code.names[arg]
+    elif op == Op.Callee:
+        site = code.sites[arg]
+        inline = f"inline {site.builtin}, " if site.builtin else ""
+        return f"{inline}else to {site.end}"
+    elif op in (Op.Jump, Op.JumpIfFalse):
+        return f"to {arg}"
+    elif op == Op.Lambda:
+        return f"code {arg}"
+    return ""
+
+def disassemble(code, indent="", label=""):
+    """
+    Returns a listing of `code` and the code nested in it, one
+    instruction per line with its offset and source location.
+    """
+    params = " ".join(code.params)
+    lines = [f"{indent}code {label}{code.name or '<lambda>'} ({params})"]
+    for pc in range(0, len(code.instructions), 2):
+        op = Op(code.instructions[pc])
+        arg = code.instructions[pc + 1]
+        loc = f"{code.lines[pc // 2] + 1}:{code.cols[pc // 2] + 1}"
+        line = f"{indent}{pc:>6} {loc:>8}  {op.name:<10} {arg:>4}"
+        if comment := describe(code, op, arg):
+            line += f"  ; {comment}"
+        lines.append(line)
+    for i, nested in enumerate(code.codes):
+        lines.append(disassemble(nested, indent + "    ", f"{i} "))
+    return "\n".join(lines)
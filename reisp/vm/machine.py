@@ -0,0 +1,137 @@
+from reisp.loc import Loc
+from reisp.ast.node import Node
+from reisp.ast.node_err import NodeErr
+from reisp.vm.opcode import Op
+from reisp.vm.compiler import compile_code, inline_builtins
+from reisp.std.func import is_truthy, make_lambda
+
+def body_code(func):
+    # The code is kept on the body, so it goes away along with it
+    if func.body.vm_code is None:
+        func.body.vm_code = compile_code(func.body, func.name, func.args)
+    return func.body.vm_code
+
+def evaluate(node, env):
+    return run(compile_code(node), env)
+
+# Plain ints compare faster than enum members in the dispatch loop
+(CONST, LOAD, SET, PUSH_FRAME, POP_FRAME, BIND, LAMBDA, CALLEE, CALL, TAIL_CALL, JUMP, JUMP_IF_FALSE, RETURN,
+ NOT, ADD, SUB, MUL, DIV, MOD, EQ, NEQ, LESS, GREATER, LEQ, GEQ) = (int(op) for op in Op)
+
+def run(code, env):
+    """
+    Runs `code` on `env` and returns the value it leaves on the stack,
+    or the first error. On an error the frames pushed by the code are
+    popped again, so `env` is left as it was before the call.
+
+    Note: calls between user functions don't recurse in Python; each
+    one saves the caller's position on `calls` and switches code, so
+    recursion is only limited by memory. A tail call reuses the entry
+    of the call it replaces, so a loop doesn't grow `calls` either.
+    """
+    mark = env.depth()
+    stack = []
+    calls = []
+    instructions, consts, names, sites = code.instructions, code.consts, code.names, code.sites
+    pc = 0
+    while True:
+        op = instructions[pc]
+        arg = instructions[pc + 1]
+        pc += 2
+        if op == LOAD:
+            if (value := env.get(names[arg])) is None:
+                env.unwind(mark)
+                return NodeErr.IdentNotFound(Loc(code.lines[pc // 2 - 1], code.cols[pc // 2 - 1]), names[arg])
+            stack.append(value)
+        elif op == CONST:
+            stack.append(consts[arg])
+        elif op == CALLEE:
+            func = stack[-1]
+            site = sites[arg]
+            if site.builtin:
+                if func is inline_builtins[site.builtin]:
+                    stack.pop()
+                    continue
+            elif (isinstance(func, Node.UserFunc) and len(func.args) == len(site.node.values) - 1
+                  and func.memo is None):
+                continue
+            stack.pop()
+            node = site.node
+            if not func.is_callable():
+                result = NodeErr.NotCallable(node.values[0].loc, func)
+            else:
+                result = func.call(node, env, node.values[1:])
+            if result.is_err():
+                env.unwind(mark)
+                return result
+            stack.append(result)
+            pc = site.end
+        elif op == JUMP_IF_FALSE:
+            if not is_truthy(stack.pop()):
+                pc = arg
+        elif op == JUMP:
+            pc = arg
+        elif op == CALL or op == TAIL_CALL:
+            func = stack[-1 - arg]
+            if op == CALL:
+                calls.append((code, pc, env.depth()))
+            func.bind(env, calls[-1][2], stack[len(stack) - arg:])
+            del stack[len(stack) - arg - 1:]
+            code = body_code(func)
+            instructions, consts, names, sites = code.instructions, code.consts, code.names, code.sites
+            pc = 0
+        elif op == RETURN:
+            if not calls:
+                return stack.pop()
+            code, pc, depth = calls.pop()
+            env.unwind(depth)
+            instructions, consts, names, sites = code.instructions, code.consts, code.names, code.sites
+        elif op >= NOT:
+            loc = Loc(code.lines[pc // 2 - 1], code.cols[pc // 2 - 1])
+            if op == NOT:
+                stack[-1] = Node.Bool(loc, not stack[-1].value)
+                continue
+            right = stack.pop().value
+            left = stack.pop().value
+            if op == ADD:
+                stack.append(Node.Int(loc, left + right))
+            elif op == SUB:
+                stack.append(Node.Int(loc, left - right))
+            elif op == MUL:
+                stack.append(Node.Int(loc, left * right))
+            elif op == DIV:
+                if right == 0:
+                    env.unwind(mark)
+                    return NodeErr.ZeroDiv(sites[arg].node.values[2].loc)
+                stack.append(Node.Int(loc, left // right))
+            elif op == MOD:
+                stack.append(Node.Int(loc, left % right))
+            elif op == EQ:
+                stack.append(Node.Bool(loc, left == right))
+            elif op == NEQ:
+                stack.append(Node.Bool(loc, left != right))
+            elif op == LESS:
+                stack.append(Node.Bool(loc, left < right))
+            elif op == GREATER:
+                stack.append(Node.Bool(loc, left > right))
+            elif op == LEQ:
+                stack.append(Node.Bool(loc, left <= right))
+            else:
+                stack.append(Node.Bool(loc, left >= right))
+        elif op == PUSH_FRAME:
+            env.push()
+        elif op == POP_FRAME:
+            env.pop()
+        elif op == BIND:
+            env.add(names[arg], stack.pop())
+        elif op == SET:
+            if env.get(names[arg]):
+                env.unwind(mark)
+                return NodeErr.VarAlreadyExists(Loc(code.lines[pc // 2 - 1], code.cols[pc // 2 - 1]), names[arg])
+            env.add(names[arg], stack[-1])
+        elif op == LAMBDA:
+            nested = code.codes[arg]
+            if nested.source.vm_code is None:
+                nested.source.vm_code = nested
+            loc = Loc(code.lines[pc // 2 - 1], code.cols[pc // 2 - 1])
+            stack.append(make_lambda(loc, nested.params, nested.source, env))
@@ -0,0 +1,43 @@
+from enum import IntEnum, auto
+
+class Op(IntEnum):
+    # Pushes consts[arg]
+    Const = auto()
+    # Pushes the value of names[arg]
+    Load = auto()
+    # Defines names[arg] as the value on top of the stack, like `set`
+    Set = auto()
+    PushFrame = auto()
+    PopFrame = auto()
+    # Pops a value and binds it to names[arg] in the top frame
+    Bind = auto()
+    # Pushes a function running codes[arg]
+    Lambda = auto()
+    # Checks the function on top of the stack against sites[arg]. If
+    # the call cannot run inline, it is made by the tree-walker and the
+    # machine jumps to the end of the call site.
+    Callee = auto()
+    # Pops arg values and the function below them, and calls it with
+    # a new frame binding its parameters to the values
+    Call = auto()
+    # Like `Call`, but in place of the current call, which must be a
+    # function body in tail position
+    TailCall = auto()
+    Jump = auto()
+    # Pops a value and jumps to arg if it is false or nil
+    JumpIfFalse = auto()
+    Return = auto()
+    Not = auto()
+    Add = auto()
+    Sub = auto()
+    Mul = auto()
+    # Like the other operators, but arg is the call site, for the
+    # location of a division by zero
+    Div = auto()
+    Mod = auto()
+    Eq = auto()
+    Neq = auto()
+    Less = auto()
+    Greater = auto()
+    Leq = auto()
+    Geq = auto()
@@ -0,0 +1,34 @@
+from reisp.parser.iterative_parser import IterativeParser
+from reisp.lexer.scanner import Scanner
+from reisp.env.env import Env
+from reisp.std.register import register_exports
+
+# What the tests share for parsing and running source text
+
+def parse(text):
+    # The forms of `text`, followed by the error that stopped parsing,
+    # if any
+    scanner = Scanner(text)
+    return list(IterativeParser(scanner, lexer=scanner).iter_forms())
+
+def make_env(cls=Env):
+    env = cls()
+    register_exports(env)
+    return env
+
+def tree_eval(node, env):
+    return node.eval(env)
+
+def evaluate_all(text, eval_func=tree_eval, env=None):
+    # Runs the forms of `text` one after the other in `env`, a new `Env`
+    # by default, and returns their values. Every frame pushed along the
+    # way must have been popped again.
+    if env is None:
+        env = Env()
+    register_exports(env)
+    results = [eval_func(node, env) for node in parse(text)]
+    assert env.depth() == 1
+    return results
+
+def run(text, eval_func=tree_eval, env=None):
+    return [result.show() for result in evaluate_all(text, eval_func, env)]
@@ -0,0 +1,71 @@
+from reisp.cache.ast_cache import (encode, decode, load_cache, save_cache, source_digest, cache_path,
+                                  CacheWriter, BATCH_SIZE, header)
+from reisp.ast.node import Node
+from tests.helpers import parse
+import marshal
+import os
+
+text = """(set x (+ 1 -2))
+nil true false "s\\n" 'a ''(b 'c) ()
+$int $(int | [str] | ?a) $'sym $nil
+(f\n  (g 123456789012345678901234567890))
+"""
+
+def test_round_trip():
+    nodes = parse(text)
+    assert decode(marshal.loads(marshal.dumps(encode(nodes)))) == nodes
+
+def test_deep_nesting():
+    depth = 20000
+    nodes = parse("(" * depth + ")" * depth)
+    node = decode(encode(nodes))[0]
+    for i in range(depth - 1):
+        node = node.values[0]
+    assert node.values == []
+
+def test_cache_file(tmp_path):
+    nodes = parse(text)
+    path = cache_path(str(tmp_path / "test.rsp"))
+    digest = source_digest(text.encode())
+    assert load_cache(path, digest) is None
+    save_cache(path, digest, nodes)
+    assert load_cache(path, digest) == nodes
+    assert load_cache(path, source_digest(b"other")) is None
+
+def test_cache_path():
+    assert cache_path("dir/prog.rsp") == "dir/prog.rsp.reispc"
+    assert cache_path("prog.reispc") != "prog.reispc"
+
+def test_corrupt_cache(tmp_path):
+    path = str(tmp_path / "test.reispc")
+    digest = source_digest(text.encode())
+    save_cache(path, digest, parse(text))
+    with open(path, "r+b") as f:
+        f.truncate(60)
+    assert load_cache(path, digest) is None
+
+def test_writer_batches(tmp_path):
+    many = "".join(f"(f {i})" for i in range(BATCH_SIZE * 2 + 1))
+    nodes = parse(many)
+    path = str(tmp_path / "many.reispc")
+    digest = source_digest(many.encode())
+    writer = CacheWriter(path, digest)
+    for node in nodes:
+        writer.add(node)
+    # Only the forms of the last batch are still held
+    assert len(writer.batch) == 1 and not os.path.exists(path)
+    writer.commit()
+    writer.close()
+    assert load_cache(path, digest) == nodes
+    # Cut just after the first batch, which is still whole
+    with open(path, "r+b") as f:
+        f.truncate(header.size + len(marshal.dumps(encode(nodes[:BATCH_SIZE]))))
+    assert load_cache(path, digest) is None
+
+def test_writer_closed(tmp_path):
+    path = str(tmp_path / "test.reispc")
+    writer = CacheWriter(path, source_digest(text.encode()))
+    for node in parse(text):
+        writer.add(node)
+    writer.close()
+    assert os.listdir(tmp_path) == []
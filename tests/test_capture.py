@@ -0,0 +1,62 @@
+from reisp.compiler import closure
+from reisp.vm import machine
+from reisp.env.env import Env
+from reisp.env.slot_env import SlotEnv
+from reisp.env.resolve import resolve, free_names
+from tests.helpers import parse, make_env, run
+
+def assert_results(text, expected):
+    assert run(text, env=Env()) == expected
+    assert run(text, lambda node, env: resolve(node).eval(env), SlotEnv()) == expected
+    assert run(text, closure.evaluate, SlotEnv()) == expected
+    assert run(text, machine.evaluate, SlotEnv()) == expected
+
+def test_returned_closure():
+    assert_results("""
+    (set adder (lambda (n) (lambda (x) (+ x n))))
+    (set add5 (adder 5))
+    (add5 1)
+    ((adder 2) 3)
+    (let (n 100) (add5 1))
+    """, ["#<lambda>", "#<lambda>", "6", "5", "6"])
+
+def test_nested_capture():
+    assert_results("""
+    (set curry (lambda (a) (lambda (b) (lambda (c) (- (* a b) c)))))
+    (((curry 3) 4) 5)
+    (let (k 2) (let (f (lambda (x) (* x k))) (let (k 10) (f 7))))
+    """, ["#<lambda>", "7", "14"])
+
+def test_globals_stay_dynamic():
+    assert_results("""
+    (set g (lambda () (+ late m)))
+    (set late 2)
+    (let (m 3) (g))
+    (set loop (lambda (n acc) (if (= n 0) acc (loop (- n 1) (+ acc n)))))
+    (loop 100 0)
+    """, ["#<lambda>", "2", "5", "#<lambda>", "5050"])
+
+def test_only_used_variables():
+    env = make_env(SlotEnv)
+    node, = parse("(let (a 1) (let (b 2) (let (c 3) (lambda (x) (+ x (let (b 4) (* a b)))))))")
+    func = node.eval(env)
+    assert func.free == ["a"]
+    assert [value.value for value in func.captured] == [1]
+    lambda_node = node.values[2].values[2].values[2]
+    assert free_names(["x"], lambda_node.values[2]) == ["+", "let", "*", "a"]
+
+def test_memo_keeps_captured():
+    assert_results("""
+    (set scaled (let (k 3) (memo (lambda (x) (* x k)) 10)))
+    (scaled 4)
+    (scaled 4)
+    (memo-stats scaled)
+    """, ["#<lambda>", "12", "12", "(1 1 1 10)"])
+
+def test_free_names_kept_on_body():
+    node, = parse("(lambda (x) (+ x y))")
+    body = node.values[2]
+    assert free_names(["x"], body) is free_names(["x"], body)
+    assert body.free_names == ["+", "y"]
+    # Not part of the node's value
+    assert body == parse("            (+ x y)")[0] and "free_names" not in repr(body)
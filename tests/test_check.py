@@ -0,0 +1,87 @@
+from reisp.types.check import check, Checker
+from reisp.types.type import Type
+from reisp.compiler import closure
+from reisp.vm import machine
+from reisp.ast.node import Node
+from reisp.ast.node_err import NodeErr
+from reisp.env.slot_env import SlotEnv
+from reisp.env.resolve import resolve
+from tests.helpers import parse, make_env, run
+
+def type_of(text):
+    checker = Checker(make_env(SlotEnv))
+    return checker.resolve(checker.check(parse(text)[0], {})[1]).show()
+
+def run_checked(text, eval_func):
+    return run(text, lambda node, env: eval_func(check(node, env), env), SlotEnv())
+
+def test_types():
+    assert type_of("(+ 1 (* 2 3))") == "int"
+    assert type_of("(< 1 2)") == "bool"
+    assert type_of("(let (x \"a\") x)") == "str"
+    assert type_of("(if (= 1 2) 1 \"a\")") == "int | str"
+    assert type_of("(if true 1 2)") == "int"
+    assert type_of("(lambda (n) (+ n 1))") == "func"
+    assert type_of("'(1 2 3)") == "'[int]"
+    assert type_of("(f 1)") == "any"
+
+def test_errors():
+    env = make_env(SlotEnv)
+    err = check(parse("(+ 1 \"a\")")[0], env)
+    assert isinstance(err, NodeErr.TypeMismatch)
+    assert (err.loc.line, err.loc.col) == (0, 5)
+    assert err.show() == "Expected a value of type int (got str)"
+    err = check(parse("(let (x true) (* x 2))")[0], env)
+    assert (err.loc.col, err.got) == (17, Type.Bool())
+    # The type of a parameter comes from its first use
+    err = check(parse("(lambda (s) (if (< s 1) s (! (+ s \"x\"))))")[0], env)
+    assert (err.loc.col, err.expected) == (34, Type.Int())
+    err = check(parse("(lambda (x) (let (y (= x 1)) (- y 1)))")[0], env)
+    assert err.got == Type.Bool()
+
+def test_not_checked():
+    env = make_env(SlotEnv)
+    # Free variables in a function depend on the caller
+    assert not check(parse("(lambda () (+ x 1))")[0], env).is_err()
+    assert not check(parse("(let (+ (lambda (a b) a)) (+ \"a\" 1))")[0], env).is_err()
+    assert not check(parse("(g \"a\" (- 2 1))")[0], env).is_err()
+
+def test_checked_nodes():
+    node = check(parse("(lambda (n) (+ (* n n) 1))")[0], make_env(SlotEnv))
+    body = node.values[2]
+    assert isinstance(body, Node.Checked) and body.proven is Type.Int()
+    assert isinstance(body.original.values[1], Node.Checked)
+    assert sorted(name for name, _ in body.deps) == ["*", "+"]
+    node = check(parse("(lambda (n) (+ n (f n)))")[0], make_env(SlotEnv))
+    assert isinstance(node.values[2], Node.List)
+
+def test_same_results():
+    text = """
+    (set sq (lambda (n) (+ (* n n) 1)))
+    (sq 7)
+    (set cmp (lambda (a b) (if (< (% a 3) (- b 1)) (= a b) (! (!= a b)))))
+    (cmp 4 5)
+    (cmp 5 2)
+    (set bad (lambda (n) (/ n (- n 5))))
+    (bad 5)
+    (bad 10)
+    (let (x 10) (* x (+ x 1)))
+    """
+    expected = run_checked(text, lambda node, env: node.eval(env))
+    assert expected == ["#<lambda>", "50", "#<lambda>", "false", "false", "#<lambda>",
+                        "Division by zero", "2", "110"]
+    assert run_checked(text, lambda node, env: resolve(node).eval(env)) == expected
+    assert run_checked(text, closure.evaluate) == expected
+    assert run_checked(text, machine.evaluate) == expected
+
+def test_rebound_operator():
+    text = """
+    (set f (lambda (n) (+ n 1)))
+    (let (+ (lambda (a b) (* a b))) (f 5))
+    (f 5)
+    """
+    expected = ["#<lambda>", "5", "6"]
+    assert run_checked(text, lambda node, env: node.eval(env)) == expected
+    assert run_checked(text, lambda node, env: resolve(node).eval(env)) == expected
+    assert run_checked(text, closure.evaluate) == expected
+    assert run_checked(text, machine.evaluate) == expected
@@ -0,0 +1,57 @@
+from reisp.compiler.closure import evaluate
+from tests.helpers import parse, make_env, evaluate_all
+import gc
+import weakref
+
+def assert_same(text):
+    assert evaluate_all(text, evaluate) == evaluate_all(text)
+
+def test_arithmetic():
+    assert_same("(+ (* 60 60) 24) (- 3 10) (/ 7 2) (% 7 3) (! true)")
+    assert_same("(= 1 1) (!= 1 2) (< 1 2) (> 1 2) (<= 2 2) (>= 1 2)")
+
+def test_bindings():
+    assert_same("(set x 10) (let (y (+ x 1)) (* y y)) (let () x) x (set x 2)")
+
+def test_lambda():
+    assert_same("(set sq (lambda (a) (* a a))) (sq 12) ((lambda (a b) (- a b)) 5 3)")
+    assert_same("(set f (lambda (a b) b)) (f 1 a) (sq 1)")
+
+def test_errors():
+    assert_same("(/ 1 0) y (1 2) (+ 1) (+ (/ 1 0) 2) (let (z (/ 1 0)) z)")
+
+def test_shadowing():
+    assert_same("(set add +) (let (+ -) (+ 5 3)) ((lambda (+) (+ 1 2)) *) (add 1 2)")
+
+def test_quote():
+    assert_same("'a '(1 2) ''b () $int nil \"s\"")
+
+def test_tail_calls():
+    assert_same("""
+    (set loop (lambda (n acc) (if (= n 0) acc (let (m (- n 1)) (loop m (+ acc n))))))
+    (loop 20000 0) (if nil 1 2) (if 0 1 2) (loop 5 nope)
+    (set g (lambda () (+ n 1))) ((lambda (n +) (g)) 10 -) ((lambda (n) (let (m 1) (g))) 3)
+    """)
+
+def test_error_unwinds():
+    env = make_env()
+    node, = parse("(let (a 1) ((lambda (b) (let () (/ b 0))) a))")
+    assert evaluate(node, env).show() == "Division by zero"
+    assert env.depth() == 1
+
+def test_unboxed_operands():
+    assert_same("(+ (* 2 (- 7 3)) (% 9 4)) (< (+ 1 1) (* 2 2)) (! (= 1 2)) (if (< 1 2) 1 2) (if (- 1 1) 1 2)")
+    assert_same("(set f (lambda (a) (* (+ a 1) (+ a 1)))) (f 3) ((lambda (+) (f 3)) -) (let (* +) (f 2))")
+    assert_same("(set n nil) (if n 1 2) ((lambda (<) (if (< 1 2) 1 2)) (lambda (a b) nil)) (+ 1 (/ 2 0))")
+
+def test_shared_bool_results():
+    _, first, second = evaluate_all("(set f (lambda (a) (< a 2))) (f 1) (f 0)", evaluate)
+    assert first is second
+
+def test_bodies_not_kept():
+    node, = parse("((lambda (x) (* x 2)) 21)")
+    assert evaluate(node, make_env()).value == 42
+    body = weakref.ref(node.values[0].values[2])
+    del node
+    gc.collect()
+    assert body() is None
@@ -0,0 +1,54 @@
+from reisp.buffer.file_buffer import FileBuffer
+from reisp.parser.parser import Parser
+from reisp.ast.node import Node
+from reisp.loc import Loc
+
+def write(tmp_path, text):
+    path = tmp_path / "test.rsp"
+    path.write_text(text, encoding="utf-8")
+    return path
+
+def test_chars(tmp_path):
+    text = "(a\n  \"héllo☃\")\n"
+    with FileBuffer(write(tmp_path, text), chunk_size=3) as buffer:
+        chars = []
+        while (char := next(buffer)) is not None:
+            chars.append(char)
+        assert "".join(chars) == text
+
+def test_loc(tmp_path):
+    with FileBuffer(write(tmp_path, "ab\ncd"), chunk_size=2) as buffer:
+        for i in range(4):
+            next(buffer)
+        assert buffer.loc == Loc(1, 0)
+        next(buffer)
+        assert buffer.loc == Loc(1, 1)
+        assert next(buffer) is None
+
+def test_is_eol(tmp_path):
+    with FileBuffer(write(tmp_path, "a  \t \nb"), chunk_size=2) as buffer:
+        next(buffer)
+        assert buffer.is_eol()
+        next(buffer)
+        next(buffer)
+        assert buffer.is_eol()
+
+def test_get_line(tmp_path):
+    with FileBuffer(write(tmp_path, "one\ntwo\nthree")) as buffer:
+        assert buffer.get_line(2) == "three\n"
+        assert buffer.get_line(0) == "one\n"
+        assert buffer.get_line(5) == "\n"
+
+def test_parse(tmp_path):
+    with FileBuffer(write(tmp_path, "(+ 1\n 2)\nfoo"), chunk_size=4) as buffer:
+        parser = Parser(buffer)
+        node = parser.parse_expr()
+        assert isinstance(node, Node.List)
+        assert node.values[2].loc == Loc(1, 1)
+        node = parser.parse_expr()
+        assert isinstance(node, Node.Ident)
+        assert node.loc == Loc(2, 0)
+
+def test_empty(tmp_path):
+    with FileBuffer(write(tmp_path, "")) as buffer:
+        assert next(buffer) is None
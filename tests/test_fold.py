@@ -0,0 +1,56 @@
+from reisp.compiler.fold import fold
+from reisp.types.check import check
+from reisp.compiler import closure
+from reisp.vm import machine
+from reisp.ast.node import Node
+from tests.helpers import parse, make_env, run
+
+def assert_same(text):
+    expected = run(text)
+    assert run(text, lambda node, env: fold(node, env).eval(env)) == expected
+    assert run(text, lambda node, env: closure.evaluate(fold(node, env), env)) == expected
+    assert run(text, lambda node, env: machine.evaluate(fold(node, env), env)) == expected
+
+def test_fold_arithmetic():
+    node = fold(parse("(+ (* 60 60) 24)")[0], make_env())
+    assert isinstance(node, Node.Folded)
+    assert node.value == Node.Int(node.loc, 3624)
+    assert sorted(name for name, _ in node.deps) == ["*", "+"]
+
+def test_fold_let():
+    node = fold(parse("(let (x (* 2 3)) (if (< x 10) x 0))")[0], make_env())
+    assert isinstance(node, Node.Folded)
+    assert node.value.value == 6
+    node = fold(parse("(let (x 2) (f x))")[0], make_env())
+    assert isinstance(node.values[2].values[1], Node.Ident)
+
+def test_keep_zero_div():
+    node = fold(parse("(+ 1 (/ 4 (- 2 2)))")[0], make_env())
+    assert isinstance(node, Node.List)
+    assert isinstance(node.values[2].values[2], Node.Folded)
+    err = node.eval(make_env())
+    assert err.is_err() and err.loc == node.values[2].values[2].loc
+
+def test_shadowed():
+    node = fold(parse("(let (+ -) (+ 5 3))")[0], make_env())
+    assert not isinstance(node.values[2], Node.Folded)
+    node = fold(parse("(lambda (*) (* 5 3))")[0], make_env())
+    assert not isinstance(node.values[2], Node.Folded)
+
+def test_same_results():
+    assert_same("(+ (* 60 60) 24) (- 3 10) (/ 7 0) (! true) (if (= 1 1) 2 3)")
+    assert_same("(set x (let (y (+ 1 2)) (* y y))) (let (z 4) (set w z)) w (let (x 1) x)")
+    assert_same("(set f (lambda (a) (+ a (* 2 3)))) (f 1) ((lambda (+) (f 1)) -)")
+    assert_same("(set g (lambda () (let (n 2) (+ n 1)))) ((lambda (let) (g)) +)")
+
+def test_keep_type_errors():
+    assert isinstance(fold(parse("(+ 1 \"a\")")[0], make_env()), Node.List)
+
+def test_unreached_errors():
+    text = "(if false (% 5 0) 1) (set f (lambda (x) (if x (% 5 0) 1))) (f false) (if false (! nil) 0)"
+    assert run(text, lambda node, env: fold(node, env).eval(env)) == ["1", "#<lambda>", "1", "0"]
+    assert_same(text)
+    # Left for the type checker to report
+    node = fold(parse("(+ 1 nil)")[0], make_env())
+    assert isinstance(node, Node.List)
+    assert check(node, make_env()).show() == "Expected a value of type int (got nil)"
@@ -0,0 +1,55 @@
+from reisp.env.hamt import Hamt, Collision
+import random
+
+class Key:
+    # A key whose hash is chosen, to make collisions
+    def __init__(self, name, h):
+        self.name = name
+        self.h = h
+
+    def __hash__(self):
+        return self.h
+
+    def __eq__(self, other):
+        return isinstance(other, Key) and self.name == other.name
+
+def test_get_set():
+    empty = Hamt()
+    one = empty.set("a", 1)
+    two = one.set("b", 2).set("a", 3)
+    assert empty.get("a") is None and len(empty) == 0
+    assert one.get("a") == 1 and one.get("b") is None and len(one) == 1
+    assert two.get("a") == 3 and two.get("b") == 2 and len(two) == 2
+    assert "b" in two and "b" not in one
+
+def test_many_keys():
+    rng = random.Random(0)
+    expected = {}
+    versions = []
+    hamt = Hamt()
+    for i in range(5000):
+        key = f"k{rng.randrange(3000)}"
+        hamt = hamt.set(key, i)
+        expected[key] = i
+        if i % 1000 == 0:
+            versions.append((hamt, dict(expected)))
+    assert len(hamt) == len(expected)
+    assert dict(hamt.items()) == expected
+    assert all(hamt.get(key) == value for key, value in expected.items())
+    # Earlier versions are left as they were
+    for version, contents in versions:
+        assert dict(version.items()) == contents
+
+def test_collisions():
+    keys = [Key(f"k{i}", 42) for i in range(5)] + [Key("other", 42 + (1 << 40)), Key("neg", -1)]
+    hamt = Hamt()
+    for i, key in enumerate(keys):
+        hamt = hamt.set(key, i)
+    hamt = hamt.set(Key("k2", 42), "changed")
+    assert len(hamt) == len(keys)
+    assert [hamt.get(key) for key in keys] == [0, 1, "changed", 3, 4, 5, 6]
+    assert hamt.get(Key("k9", 42)) is None
+    node = hamt.root
+    while not isinstance(node, Collision):
+        node = next(entry for entry in node.entries if not isinstance(entry, tuple))
+    assert len(node.entries) == 5
@@ -0,0 +1,56 @@
+from reisp.parser.incremental import Document
+from reisp.ast.node import Node
+from reisp.loc import Loc
+import random
+
+text = """(set a 10)
+(set b (+ a
+          2))  (f 'x "str\\n")
+$(int | str) nil
+(g (h 1) (i "a b"))
+"""
+
+def assert_fresh(document):
+    fresh = Document(document.text)
+    assert [(form.start, form.end) for form in document.forms] == \
+        [(form.start, form.end) for form in fresh.forms]
+    assert [form.node for form in document.forms] == [form.node for form in fresh.forms]
+
+def test_parse():
+    document = Document(text)
+    assert len(document.forms) == 6
+    assert isinstance(document.forms[2].node, Node.List)
+    assert document.forms[3].node.loc == Loc(3, 0)
+
+def test_edit_reuses_forms():
+    document = Document(text)
+    last = document.forms[-1].node
+    changed = document.edit(7, 9, "1\n\n\n")
+    assert len(changed) == 1
+    assert document.forms[-1].node is last
+    assert last.loc == Loc(7, 0)
+    assert_fresh(document)
+
+def test_edit_same_line():
+    document = Document(text)
+    start = text.index("(f")
+    document.edit(start - 2, start - 1, "  (extra)")
+    assert_fresh(document)
+
+def test_string_edit():
+    document = Document(text)
+    document.edit(0, 0, '"')
+    assert isinstance(document.forms[0].node, Node.Str)
+    assert_fresh(document)
+    document.edit(0, 1, "")
+    assert_fresh(document)
+
+def test_random_edits():
+    rng = random.Random(1234)
+    pieces = ["(", ")", " ", "\n", "x", "12", '"', "'", "$int", "(q r)"]
+    document = Document(text)
+    for i in range(300):
+        start = rng.randrange(len(document.text) + 1)
+        end = min(len(document.text), start + rng.randrange(4))
+        document.edit(start, end, "".join(rng.choice(pieces) for i in range(rng.randrange(3))))
+        assert_fresh(document)
@@ -0,0 +1,36 @@
+from reisp.env import watch
+from reisp.env.env import Env
+from reisp.env.slot_env import SlotEnv
+from tests.helpers import parse, make_env
+
+def test_cache_global():
+    env = make_env()
+    node, = parse("(+ 1 2)")
+    assert node.eval(env).value == 3
+    assert node.cache_func is env.get("+")
+    assert node.cache_version == watch.version
+    # A hit doesn't look the name up at all
+    node.cache_func = env.get("-")
+    assert node.eval(env).value == -1
+
+def test_no_cache_local():
+    env = make_env()
+    node, = parse("((lambda (f) (f 1 2)) +)")
+    assert node.eval(env).value == 3
+    inner = node.values[0].values[2]
+    assert inner.cache_env is None
+
+def test_invalidate_on_shadow():
+    for cls in [Env, SlotEnv]:
+        env = make_env(cls)
+        forms = parse("(set g (lambda () (+ 5 3))) (g) ((lambda (+) (g)) -) (g)")
+        assert [form.eval(env).show() for form in forms] == ["#<lambda>", "8", "2", "8"]
+
+def test_other_env():
+    node, = parse("(f)")
+    env = make_env()
+    env.add("f", parse("(lambda () 1)")[0].eval(env))
+    assert node.eval(env).value == 1
+    other = make_env()
+    other.add("f", parse("(lambda () 2)")[0].eval(other))
+    assert node.eval(other).value == 2
@@ -0,0 +1,45 @@
+from reisp.parser.iterative_parser import IterativeParser
+from reisp.parser.predictive_parser import PredictiveParser
+from reisp.lexer.scanner import Scanner
+from reisp.ast.node import Node
+
+def parse_all(parser_type, text):
+    scanner = Scanner(text)
+    parser = parser_type(scanner, lexer=scanner)
+    nodes = []
+    while True:
+        node = parser.parse_expr()
+        nodes.append(node)
+        if node.is_err():
+            return nodes
+
+def assert_same(text):
+    assert parse_all(IterativeParser, text) == parse_all(PredictiveParser, text)
+
+def test_same_nodes():
+    assert_same("(set x (+ 1 -2)) nil true \"s\" 'a ''(b 'c) () (())")
+    assert_same("(f $(int | str) '$[bool]\n  (g (h 1)\n  '(i)))")
+
+def test_same_errors():
+    assert_same("(a b")
+    assert_same("(a int)")
+    assert_same(")")
+    assert_same("'")
+    assert_same("(a '$)")
+
+def test_deep_nesting():
+    depth = 50000
+    scanner = Scanner("(" * depth + "x" + ")" * depth)
+    node = IterativeParser(scanner, lexer=scanner).parse_expr()
+    for i in range(depth):
+        assert isinstance(node, Node.List)
+        node = node.values[0]
+    assert isinstance(node, Node.Ident)
+
+def test_deep_quotes():
+    depth = 50000
+    scanner = Scanner("'" * depth + "()")
+    node = IterativeParser(scanner, lexer=scanner).parse_expr()
+    for i in range(depth):
+        node = node.value
+    assert node == Node.List(values=[], loc=node.loc)
@@ -138,3 +138,8 @@ def test_whitespace():
     token = next(lexer)
     assert token.type == TokenType.Paren
     assert token.value == "("
+
+def test_ident_interned():
+    buffer = StringBuffer("foo " + "".join(["f", "o", "o"]))
+    lexer = Lexer(buffer)
+    assert next(lexer).value is next(lexer).value
@@ -0,0 +1,46 @@
+from reisp.compiler import closure
+from reisp.vm import machine
+from tests.helpers import run
+
+fib = """
+(set fib (memo (lambda (n) (if (< n 2) n (+ (fib (- n 1)) (fib (- n 2))))) 100))
+(fib 80)
+(memo-stats fib)
+"""
+
+def test_fib():
+    for eval_func in [lambda node, env: node.eval(env), closure.evaluate, machine.evaluate]:
+        assert run(fib, eval_func)[1:] == ["23416728348467685", "(78 81 81 100)"]
+
+def test_lru_eviction():
+    text = """
+    (set sq (memo (lambda (n) (* n n)) 2))
+    (sq 1) (sq 2) (sq 1) (sq 3) (sq 2)
+    (memo-stats sq)
+    (memo-clear sq)
+    (memo-stats sq)
+    """
+    assert run(text)[6:] == ["(1 4 2 2)", "nil", "(0 0 0 2)"]
+
+def test_unhashable_args_and_errors():
+    text = """
+    (set f (memo (lambda (x) (/ 10 x)) 10))
+    (f 0) (f 0) (f 5)
+    (set g (memo (lambda (x) x) 10))
+    (g '(1 2)) (g '(1 2))
+    (memo-stats f)
+    (memo-stats g)
+    """
+    results = run(text)
+    assert results[1:4] == ["Division by zero", "Division by zero", "2"]
+    assert results[5:] == ["(1 2)", "(1 2)", "(0 3 1 10)", "(0 0 0 10)"]
+
+def test_memo_errors():
+    assert run("(memo + 10) (memo-stats (lambda () 1))") == [
+        "Expected a user function (got #<func +>)", "Expected a memoized function (got #<lambda>)"]
+    assert run("""(memo (lambda (x) x) -1) (memo (lambda (x) x) "x") (memo (lambda (x) x) true)
+    (set f (memo (lambda (x) x) 0)) (f 1) (f 1) (memo-stats f)""") == [
+        "Expected a non-negative int as the limit (got -1)",
+        'Expected a non-negative int as the limit (got "x")',
+        "Expected a non-negative int as the limit (got true)",
+        "#<lambda>", "1", "1", "(0 2 0 0)"]
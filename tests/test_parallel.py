@@ -0,0 +1,33 @@
+from reisp.parser.parallel import parse_parallel, split_offsets
+from tests.helpers import parse
+
+text = "".join(f"""(set x{i} (+ {i} 1)) a"b "(\\")" '(q $[int])
+  (f "
+)" (g {i})) top{i}
+""" for i in range(200))
+
+def test_split_offsets():
+    offsets = split_offsets(text, 8)
+    assert len(offsets) == 7
+    for offset in offsets:
+        assert text[offset - 1] == ")"
+        forms = parse(text[:offset]) + parse(text[offset:])
+        assert not any(form.is_err() for form in forms)
+        assert len(forms) == len(parse(text))
+
+def test_parallel():
+    assert parse_parallel(text, workers=2, min_chunk_size=256) == parse(text)
+
+def test_brackets():
+    typed = "$[(int | str)]\n" * 2000
+    for offset in split_offsets(typed, 8):
+        assert typed[offset - 1] == "]"
+    forms = parse_parallel(typed, workers=2, min_chunk_size=256)
+    assert len(forms) == 2000 and forms == parse(typed)
+
+def test_parallel_err():
+    bad = text + "(unclosed " + text
+    assert parse_parallel(bad, workers=2, min_chunk_size=256) == parse(bad)
+
+def test_serial_fallback():
+    assert parse_parallel("(a) b", workers=4) == parse("(a) b")
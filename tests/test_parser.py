@@ -111,3 +111,27 @@ def test_parse_expr():
     for i in range(7):
         node = parser.parse_expr()
         assert not node.is_err()
+
+def test_iter_forms():
+    buffer = StringBuffer("(a 1) b \"c\"")
+    parser = Parser(buffer)
+    nodes = list(parser.iter_forms())
+    assert len(nodes) == 3
+    assert isinstance(nodes[0], Node.List)
+    assert isinstance(nodes[1], Node.Ident)
+    assert isinstance(nodes[2], Node.Str)
+
+def test_iter_forms_err():
+    buffer = StringBuffer("a (b c")
+    parser = Parser(buffer)
+    nodes = list(parser.iter_forms())
+    assert len(nodes) == 2
+    assert nodes[1].is_err()
+
+def test_parse_type_shared():
+    buffer = StringBuffer("$(int | [str]) $(int | [str])")
+    parser = Parser(buffer)
+    first = parser.parse_expr()
+    second = parser.parse_expr()
+    assert first.value is second.value
+    assert first.value.left is Type.Int()
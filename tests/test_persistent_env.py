@@ -0,0 +1,46 @@
+from reisp.compiler import closure
+from reisp.vm import machine
+from reisp.ast.node import Node
+from reisp.env.persistent_env import PersistentEnv
+from tests.helpers import make_env, run
+
+def assert_same(text):
+    expected = run(text)
+    assert run(text, env=PersistentEnv()) == expected
+    assert run(text, closure.evaluate, PersistentEnv()) == expected
+    assert run(text, machine.evaluate, PersistentEnv()) == expected
+
+def test_same_results():
+    assert_same("(set x 10) (let (y (+ x 1)) (* y y)) (let () x) x (set x 2)")
+    assert_same("(set g (lambda () (+ n 1))) (let (n 1) (g)) ((lambda (n) (g)) 5) (g)")
+    assert_same("(set adder (lambda (n) (lambda (x) (+ x n)))) ((adder 5) 1) (let (n 3) ((adder 1) n))")
+    assert_same("(set loop (lambda (n) (if (= n 0) 0 (let (m n) (loop (- m 1)))))) (loop 1000) (/ 1 0)")
+
+def test_frames():
+    env = PersistentEnv()
+    env.add("g", Node.Int(None, 1))
+    env.push()
+    env.add("a", Node.Int(None, 2))
+    env.push()
+    env.add("a", Node.Int(None, 3))
+    assert env.get("a").value == 3 and env.get_local("g") is None and env.depth() == 3
+    env.rebind(1, ["b"], [Node.Int(None, 4)])
+    assert env.depth() == 2
+    assert (env.get("a").value, env.get("b").value) == (3, 4)
+    env.unwind(1)
+    assert env.get("a") is None and env.get("b") is None and env.get("g").value == 1
+
+def test_fork():
+    env = make_env(PersistentEnv)
+    for i in range(1000):
+        env.add(f"v{i}", Node.Int(None, i))
+    env.push()
+    env.add("local", Node.Int(None, -1))
+    fork = env.fork()
+    fork.add("local", Node.Int(None, -2))
+    fork.pop()
+    fork.add("v5", Node.Int(None, 500))
+    assert run("(set w (+ v5 1)) (let (v1 2) (* v1 v5))", closure.evaluate, fork) == ["501", "1000"]
+    assert env.get("local").value == -1 and env.depth() == 2
+    assert env.get("v5").value == 5 and env.get("w") is None
+    assert fork.get("local") is None and fork.get("v5").value == 500
@@ -0,0 +1,43 @@
+from reisp.parser.parser import Parser
+from reisp.parser.predictive_parser import PredictiveParser
+from reisp.lexer.scanner import Scanner
+from reisp.ast.node import Node
+from reisp.types.type import Type
+
+def parse_all(parser_type, text):
+    scanner = Scanner(text)
+    parser = parser_type(scanner, lexer=scanner)
+    nodes = []
+    while True:
+        node = parser.parse_expr()
+        nodes.append(node)
+        if node.is_err():
+            return nodes
+
+def assert_same(text):
+    assert parse_all(PredictiveParser, text) == parse_all(Parser, text)
+
+def test_same_nodes():
+    assert_same("(set x (+ 1 -2)) nil true false \"s\" 'a ''(b c) ()")
+    assert_same("$int $nil $'sym $[bool] $?a $(int | str | [any]) $(type)")
+    assert_same("(f\n  (g (h 1)\n  '(i)))")
+
+def test_same_errors():
+    assert_same("(a b")
+    assert_same("int")
+    assert_same(")")
+    assert_same("$)")
+    assert_same("$[int")
+    assert_same("$?1")
+    assert_same("$(int str)")
+    assert_same("'")
+
+def test_types():
+    node = parse_all(PredictiveParser, "$(int | [str])")[0]
+    assert isinstance(node, Node.Type)
+    assert node.value == Type.Union(Type.Int(), Type.List(Type.Str()))
+
+def test_string_punctuation():
+    node = parse_all(PredictiveParser, '(f ")" "$")')[0]
+    assert isinstance(node, Node.List)
+    assert [value.value for value in node.values[1:]] == [")", "$"]
@@ -0,0 +1,62 @@
+from reisp.env.resolve import resolve
+from reisp.env.slot_env import SlotEnv
+from reisp.ast.node import Node
+from tests.helpers import parse, run
+
+def assert_same(text):
+    expected = run(text)
+    assert run(text, lambda node, env: resolve(node).eval(env), SlotEnv()) == expected
+    assert run(text, env=SlotEnv()) == expected
+
+def test_resolve_addresses():
+    node = resolve(parse("(lambda (a b) (let (c a) (+ b (let () c))))")[0])
+    body = node.values[2]
+    assert body.values[1].values[1] == Node.Local(body.values[1].values[1].loc, "a", 0, 0)
+    inner = body.values[2]
+    assert inner.values[1] == Node.Local(inner.values[1].loc, "b", 1, 1)
+    assert inner.values[2].values[2] == Node.Local(inner.values[2].values[2].loc, "c", 1, 0)
+
+def test_resolve_leaves_free_names():
+    node = resolve(parse("(lambda (a) (lambda (b) (+ a (- b c) '(a b))))")[0])
+    inner = node.values[2].values[2]
+    # `a` is captured when the inner lambda is made, after its parameter
+    assert inner.values[1] == Node.Local(inner.values[1].loc, "a", 0, 1)
+    assert inner.values[2].values[1] == Node.Local(inner.values[2].values[1].loc, "b", 0, 0)
+    assert isinstance(inner.values[2].values[2], Node.Ident)
+    assert isinstance(inner.values[3], Node.Quote)
+
+def test_same_results():
+    assert_same("(set x 10) (let (y (+ x 1)) (* y y)) (let () x) x (set x 2)")
+    assert_same("(set sq (lambda (a) (* a a))) (sq 12) ((lambda (a b) (- a b)) 5 3)")
+    assert_same("(set k (lambda (a) (lambda (b) (+ a b)))) ((k 1) 2) (set a 5) ((k 1) 2)")
+    assert_same("(set f (lambda (a a) a)) (f 1 2) (f 1) (/ 1 0) (let (z (/ 1 0)) z)")
+
+def test_dynamic_scope():
+    assert_same("(set g (lambda () (+ n 1))) (let (n 1) (g)) ((lambda (n) (g)) 5) (g)")
+    assert_same("(set h (lambda (n) (let (m n) (set q m)))) (h 3) q")
+
+def test_rebound_let():
+    assert_same("(set f (lambda () (let (x 1) x))) ((lambda (let) (f)) +)")
+    assert_same("((lambda (let) (let 1 2)) +)")
+
+def test_slot_env_unwind():
+    env = SlotEnv()
+    env.add("g", Node.Int(None, 1))
+    env.push()
+    env.add("a", Node.Int(None, 2))
+    env.push()
+    env.add("a", Node.Int(None, 3))
+    assert env.get("a").value == 3
+    assert env.get_slot(1, 0, "a").value == 2
+    env.unwind(2)
+    assert env.get("a").value == 2
+    env.unwind(1)
+    assert env.get("a") is None
+    assert env.get("g").value == 1
+
+def test_set_local():
+    text = "(let (x 1) (set x 2)) ((lambda (x) (set x 1)) 2)"
+    expected = ["Cannot set variable 'x' because it already exists"] * 2
+    assert run(text) == expected
+    assert run(text, lambda node, env: resolve(node).eval(env)) == expected
+    assert run(text, lambda node, env: resolve(node).eval(env), SlotEnv()) == expected
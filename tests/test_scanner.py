@@ -0,0 +1,85 @@
+from reisp.parser.parser import Parser
+from reisp.ast.node import Node
+from reisp.lexer.scanner import Scanner
+from reisp.lexer.lexer import Lexer, LexErrType
+from reisp.lexer.token import TokenType
+from reisp.loc import Loc
+
+class LineBuffer:
+    def __init__(self, string):
+        self.string = string
+        self.index = -1
+        self.loc = Loc(0, -1)
+
+    def __next__(self):
+        if 0 <= self.index < len(self.string) and self.string[self.index] == "\n":
+            self.loc.line += 1
+            self.loc.col = -1
+        self.index += 1
+        self.loc.col += 1
+        if self.index >= len(self.string):
+            return None
+        return self.string[self.index]
+
+def lex_all(lexer):
+    tokens = []
+    while True:
+        token = next(lexer)
+        tokens.append(token)
+        if token.is_err() or token.type == TokenType.Eof:
+            return tokens
+
+def assert_same(string):
+    expected = lex_all(Lexer(LineBuffer(string)))
+    assert lex_all(Scanner(string)) == expected
+
+def test_same_tokens():
+    assert_same("(set x 10)\n(+ x -3)\n\t'(a b) $[int] ?a | nil true false\n")
+    assert_same('  "he\\nl\\"lo\\\\" foo"bar a$b a\'b (x)]')
+    assert_same("(f\n  (g\n    1\n   \"multi\nline\" 2) +12 -)")
+
+def test_same_errors():
+    assert_same('  (a "he\\g")')
+    assert_same('\n\n  "unterminated')
+    assert_same('x\n"ends in escape\\')
+
+def test_positions():
+    scanner = Scanner("(a\n  bc)")
+    locs = [next(scanner).loc for i in range(5)]
+    assert locs == [Loc(0, 0), Loc(0, 1), Loc(1, 2), Loc(1, 4), Loc(1, 5)]
+
+def test_offset_start():
+    scanner = Scanner("xx foo\nbar", pos=3, line=4, col=7)
+    token = next(scanner)
+    assert token.value == "foo"
+    assert token.loc == Loc(4, 7)
+    token = next(scanner)
+    assert token.value == "bar"
+    assert token.loc == Loc(5, 0)
+
+def test_eof_repeats():
+    scanner = Scanner("a")
+    assert next(scanner).type == TokenType.Ident
+    assert next(scanner).type == TokenType.Eof
+    assert next(scanner).type == TokenType.Eof
+
+def test_str_esc():
+    err = next(Scanner('"a\\q"'))
+    assert err.type == LexErrType.StrEsc
+    assert err.loc == Loc(0, 3)
+
+def test_parser_scanner():
+    scanner = Scanner("(a (b 1) \"c\")\n2")
+    parser = Parser(scanner, lexer=scanner)
+    node = parser.parse_expr()
+    assert isinstance(node, Node.List)
+    assert len(node.values) == 3
+    assert parser.is_eol()
+    node = parser.parse_expr()
+    assert isinstance(node, Node.Int)
+    assert node.loc == Loc(1, 0)
+
+def test_offset_start_past_column():
+    scanner = Scanner("a\nb c", pos=2, line=0, col=9)
+    assert next(scanner).loc == Loc(0, 9)
+    assert next(scanner).loc == Loc(0, 11)
@@ -0,0 +1,76 @@
+from reisp.env.session import Session
+from reisp.env.tracking_env import TrackingEnv
+from reisp.compiler import closure
+from reisp.vm import machine
+from tests.helpers import parse, make_env, tree_eval
+
+def make_session(evaluate=tree_eval):
+    return Session(make_env(TrackingEnv), evaluate)
+
+def run(session, text):
+    return [session.run(node).show() for node in parse(text)]
+
+def rerun(session):
+    return [(form.node.show(), form.value.show()) for form in session.rerun]
+
+defs = """
+(set x 10)
+(set y (+ x 1))
+(set z 5)
+(set f (lambda (n) (* n y)))
+(f 2)
+(+ z 1)
+"""
+
+def test_redefine():
+    for evaluate in [tree_eval, closure.evaluate, machine.evaluate]:
+        session = make_session(evaluate)
+        assert run(session, defs) == ["10", "11", "5", "#<lambda>", "22", "6"]
+        assert run(session, "(set x 20)") == ["20"]
+        assert rerun(session) == [("(set y (+ x 1))", "21"), ("(f 2)", "42")]
+        assert session.env.get("y").value == 21
+        assert run(session, "(set f (lambda (n) (- n y)))") == ["#<lambda>"]
+        assert rerun(session) == [("(f 2)", "-19")]
+
+def test_reads():
+    session = make_session()
+    run(session, defs + "(let (x 1) (+ x z))")
+    reads = session.forms[-1].reads
+    assert "z" in reads and "+" in reads and "x" not in reads
+    # The body of `f` hasn't run when it is defined
+    assert "y" not in session.definitions["f"].reads
+
+def test_equal_value_stops():
+    session = make_session()
+    run(session, "(set a 3) (set small (< a 10)) (if small 1 2)")
+    run(session, "(set a 4)")
+    assert rerun(session) == [("(set small (< a 10))", "true")]
+    run(session, "(set a 40)")
+    assert rerun(session) == [("(set small (< a 10))", "false"), ("(if small 1 2)", "2")]
+
+def test_failed_definition():
+    session = make_session()
+    run(session, "(set a 3) (set b (* a 2))")
+    assert run(session, "(set a (/ 1 0))") == ["Division by zero"]
+    assert session.rerun == []
+    assert session.env.get("a").value == 3
+    # Builtins still can't be redefined
+    assert run(session, "(set + 1)") == ["Cannot set variable '+' because it already exists"]
+    assert run(session, "(+ a 1)") == ["4"]
+    # A form that fails when run again keeps its error until it is fixed
+    run(session, "(set d 1) (set c (/ b d))")
+    assert run(session, "(set d 0)") == ["0"]
+    assert rerun(session) == [("(set c (/ b d))", "Division by zero")]
+    assert session.env.get("c") is None
+    run(session, "(set d 2)")
+    assert rerun(session) == [("(set c (/ b d))", "3")]
+    run(session, "(set a 1)")
+    assert rerun(session) == [("(set b (* a 2))", "2"), ("(+ a 1)", "2"), ("(set c (/ b d))", "1")]
+
+def test_failed_rerun_not_restored():
+    session = make_session()
+    run(session, "(set f (lambda (a) a)) (set y (f 1)) (set f 3)")
+    assert rerun(session) == [("(set y (f 1))", "Cannot call a non-function value (got 3)")]
+    assert run(session, "(set y (undefined-thing))") == ["Identifier 'undefined-thing' does not exist"]
+    assert session.env.get("y") is None
+    assert run(session, "y (set z y)") == ["Identifier 'y' does not exist"] * 2
@@ -0,0 +1,40 @@
+from reisp.env.slot_env import SlotEnv
+from reisp.env.resolve import resolve
+from tests.helpers import run
+
+loop = """
+(set loop (lambda (n acc)
+  (if (= n 0)
+    acc
+    (let (m (- n 1))
+      (loop m (+ acc n))))))
+"""
+
+def test_if():
+    assert run("(if true 1 2) (if false 1 2) (if nil 1 2) (if 0 1 2) (if x 1 2)")[:4] == ["1", "2", "2", "1"]
+
+def test_tail_loop():
+    assert run(loop + "(loop 20000 0)")[1] == "200010000"
+    assert run(loop + "(loop 20000 0)", lambda node, env: resolve(node).eval(env), SlotEnv())[1] == "200010000"
+
+def test_mutual_tail_calls():
+    text = """
+    (set even (lambda (n) (if (= n 0) true (odd (- n 1)))))
+    (set odd (lambda (n) (if (= n 0) false (even (- n 1)))))
+    (even 10001)
+    """
+    assert run(text)[2] == "false"
+
+def test_tail_call_error():
+    assert run(loop + "(loop 10 nope) (loop 3 0)")[1:] == ["Identifier 'nope' does not exist", "6"]
+
+def test_tail_call_sees_caller():
+    text = """
+    (set g (lambda () (+ n 1)))
+    (set f (lambda (n) (let (m 2) (g))))
+    (f 5)
+    ((lambda (n +) (g)) 10 -)
+    """
+    expected = ["#<lambda>", "#<lambda>", "6", "9"]
+    assert run(text) == expected
+    assert run(text, lambda node, env: resolve(node).eval(env), SlotEnv()) == expected
@@ -0,0 +1,58 @@
+from reisp.lexer.token_stream import TokenStream
+from reisp.lexer.scanner import Scanner
+from reisp.lexer.lexer import LexErrType
+from reisp.lexer.token import TokenType
+from reisp.parser.parser import Parser
+from reisp.parser.stream_parser import StreamParser
+from reisp.ast.node import Node
+from reisp.loc import Loc
+
+def test_tokens():
+    text = "(set x\n  \"str\") 'a $[int] x"
+    stream = TokenStream(text)
+    scanner = Scanner(text)
+    for i in range(len(stream)):
+        assert stream.get(i) == next(scanner)
+    assert stream.kind(len(stream) - 1) == TokenType.Eof
+
+def test_interned_values():
+    stream = TokenStream("(a a (a))")
+    assert stream.values[1] == stream.values[2] == stream.values[4]
+    assert stream.value(1) == "a"
+
+def test_errors():
+    stream = TokenStream('a\n "\\q" b')
+    assert stream.get(1).type == LexErrType.StrEsc
+    assert stream.get(1).loc == Loc(1, 3)
+
+def parse_all(parser):
+    nodes = []
+    while True:
+        node = parser.parse_expr()
+        nodes.append(node)
+        if node.is_err():
+            return nodes
+
+def test_same_as_parser():
+    text = "(f 1 (g \"s\" 'b) nil)\n$(int | [str])\n(a (b c) ?x"
+    scanner = Scanner(text)
+    expected = parse_all(Parser(scanner, lexer=scanner))
+    assert parse_all(StreamParser(TokenStream(text))) == expected
+
+def test_backtracking():
+    parser = StreamParser(TokenStream("1234 'a"))
+    assert parser.parse_quote().is_err()
+    node = parser.parse_int()
+    assert isinstance(node, Node.Int)
+    assert node.value == 1234
+    node = parser.parse_quote()
+    assert isinstance(node, Node.Quote)
+
+def test_is_eol():
+    parser = StreamParser(TokenStream("(a)\n(b) c\n"))
+    parser.parse_expr()
+    assert parser.is_eol()
+    parser.parse_expr()
+    assert not parser.is_eol()
+    parser.skip_line()
+    assert parser.peek().type == TokenType.Eof
@@ -0,0 +1,22 @@
+from reisp.types.type import Type
+from copy import copy, deepcopy
+import pickle
+
+def test_atoms_shared():
+    assert Type.Int() is Type.Int()
+    assert Type.Int() is not Type.Str()
+    assert Type.Int() != Type.Str()
+
+def test_composites_shared():
+    assert Type.List(Type.Int()) is Type.List(Type.Int())
+    assert Type.Union(Type.Int(), Type.Quote(Type.Sym())) is Type.Union(Type.Int(), Type.Quote(Type.Sym()))
+    assert Type.Infer("a") is Type.Infer(name="a")
+    assert Type.List(Type.Int()) is not Type.List(Type.Str())
+    assert Type.Union(Type.Int(), Type.Str()) is not Type.Union(Type.Str(), Type.Int())
+
+def test_copies_shared():
+    _type = Type.Union(Type.List(Type.Int()), Type.Infer("t"))
+    assert copy(_type) is _type
+    assert deepcopy(_type) is _type
+    assert pickle.loads(pickle.dumps(_type)) is _type
+    assert _type.show() == "[int] | ?t"
@@ -0,0 +1,63 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from tests.helpers import evaluate_all, run
+
+import math
+
+def test_construct():
+    assert run("(vec '(1 2 3)) (vec '(true false)) (vec '()) (vec-range 2 5)") == ["[1 2 3]", "[true false]", "[]", "[2 3 4]"]
+    assert run("(vec '(1 true))")[0].startswith("A vector can only hold")
+
+def test_elementwise():
+    assert run("(vec-map2 + (vec-range 0 4) (vec '(10 20 30 40)))") == ["[10 21 32 43]"]
+    assert run("(vec-map2 * (vec-range 0 4) 3) (vec-map2 < 2 (vec-range 0 4)) (vec-map ! (vec '(true false)))") == [
+        "[0 3 6 9]", "[false false false true]", "[false true]"]
+    assert run("(vec-map2 + (vec '(true true)) (vec '(true false)))") == ["[2 1]"]
+
+def test_elementwise_errors():
+    assert run("(vec-map2 / (vec-range 0 3) (vec-range 0 3))") == ["Division by zero"]
+    assert run("(vec-map2 + (vec-range 0 3) (vec-range 0 4))") == ["Vectors have different lengths (3 and 4)"]
+    assert run("(vec-map2 + 1 2)") == ["Expected a vector (got 1)"]
+
+def test_user_functions():
+    assert run("(vec-map (lambda (x) (* x x)) (vec-range 1 4))") == ["[1 4 9]"]
+    assert run("(vec-map2 (lambda (a b) (- b a)) (vec-range 0 3) 10)") == ["[10 9 8]"]
+    assert run("(vec-reduce (lambda (a b) (+ (* a 10) b)) (vec-range 1 4))") == ["123"]
+    assert run("(vec-filter (lambda (x) (= (% x 2) 0)) (vec-range 0 7))") == ["[0 2 4 6]"]
+
+def test_reduce_and_aggregate():
+    assert run("(vec-reduce + (vec-range 0 101)) (vec-reduce * (vec-range 1 6)) (vec-reduce + (vec '()))") == ["5050", "120", "0"]
+    assert run("(vec-reduce - (vec '())) (vec-reduce < (vec-range 0 3))") == ["Cannot reduce an empty vector", "true"]
+    assert run("(vec-len (vec-range 0 5)) (vec-sum (vec-map2 > (vec-range 0 5) 2)) (vec-min (vec-range 3 6)) (vec-max (vec '()))") == [
+        "5", "2", "3", "Cannot reduce an empty vector"]
+
+def test_overflow():
+    big = 2 ** 64 - 1
+    assert run(f"(vec '({big} 1)) (vec-map2 - (vec '({big} 1)) {big}) (vec-reduce * (vec-range 1 30))") == [
+        f"[{big} 1]", f"[0 {1 - big}]", str(math.factorial(29))]
+    assert run("(vec-map2 + (vec '(9223372036854775807)) 1) (vec-sum (vec-map2 * (vec '(4611686018427387904)) 4))") == [
+        "[9223372036854775808]", "18446744073709551616"]
+    assert run(f"(vec-map2 < (vec-range 0 3) {big}) (vec-map2 = (vec '({big})) {big}) (vec-range {big} {big + 2})") == [
+        "[true true true]", "[true]", f"[{big} {big + 1}]"]
+
+def test_narrowed_back():
+    vector, = evaluate_all("(vec-map2 - (vec '(9223372036854775808)) 1)")
+    assert vector.value.dtype == np.int64
+
+def test_equality():
+    short, long, wide, narrow, bools = evaluate_all(
+        "(vec '(1 2)) (vec '(1 2 3)) (vec '(99999999999999999999 1)) (vec '(1 1)) (vec '(true true))")
+    assert short != long and long != short
+    assert wide != narrow and narrow != wide and narrow != bools
+    assert short == evaluate_all("(vec-range 1 3)")[0]
+    wide.loc = narrow.loc
+    wide.value = wide.value.copy()
+    wide.value[0] = 1
+    assert wide == narrow
+
+def test_filter_and_slice():
+    assert run("(set v (vec-range 0 6)) (vec-filter (vec-map2 >= v 3) v) (vec-filter ! (vec '(true false)))")[1:] == ["[3 4 5]", "[false]"]
+    assert run("(set v (vec-range 0 6)) (vec-slice v 1 3) (vec-slice v -2 10) (vec-get v 2) (vec-get v 6)")[1:] == [
+        "[1 2]", "[4 5]", "2", "Index 6 is out of range for a vector of length 6"]
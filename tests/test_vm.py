@@ -0,0 +1,65 @@
+from reisp.vm.machine import evaluate, run as run_code
+from reisp.vm.compiler import compile_code
+from reisp.vm.code import dumps, loads
+from reisp.vm.disasm import disassemble
+from reisp.env.slot_env import SlotEnv
+from tests.helpers import parse, make_env, evaluate_all
+
+import gc
+import weakref
+
+def assert_same(text):
+    assert evaluate_all(text, evaluate) == evaluate_all(text)
+
+def test_arithmetic():
+    assert_same("(+ (* 60 60) 24) (- 3 10) (/ 7 2) (% 7 3) (! true)")
+    assert_same("(= 1 1) (!= 1 2) (< 1 2) (> 1 2) (<= 2 2) (>= 1 2)")
+
+def test_bindings():
+    assert_same("(set x 10) (let (y (+ x 1)) (* y y)) (let () x) x (set x 2)")
+
+def test_lambda():
+    assert_same("(set sq (lambda (a) (* a a))) (sq 12) ((lambda (a b) (- a b)) 5 3)")
+    assert_same("(set f (lambda (a b) b)) (f 1 a) (sq 1)")
+    assert_same("(set k (lambda (a) (lambda (b) (+ a b)))) ((k 1) 2)")
+
+def test_errors():
+    assert_same("(/ 1 0) y (1 2) (+ 1) (+ (/ 1 0) 2) (let (z (/ 1 0)) z)")
+    assert_same("(set f (lambda (a) (+ a missing))) (f 1) (let (x 1) (f x))")
+
+def test_shadowing():
+    assert_same("(set add +) (let (+ -) (+ 5 3)) ((lambda (+) (+ 1 2)) *) (add 1 2)")
+
+def test_quote():
+    assert_same("'a '(1 2) ''b () $int nil \"s\"")
+
+def test_serialize():
+    text = "(set sq (lambda (a) (let (b (* a a)) b))) (sq (+ 2 '3))"
+    codes = [loads(dumps(compile_code(node))) for node in parse(text)]
+    assert evaluate_all(text, lambda node, env: run_code(codes.pop(0), env)) == evaluate_all(text, evaluate)
+
+def test_disassemble():
+    listing = disassemble(compile_code(parse("(lambda (a) (+ a 1))")[0]))
+    assert "Lambda" in listing
+    assert "inline +" in listing
+    assert "; a" in listing
+
+def test_tail_calls():
+    assert_same("""
+    (set loop (lambda (n acc) (if (= n 0) acc (let (m (- n 1)) (loop m (+ acc n))))))
+    (loop 20000 0) (if nil 1 2) (if 0 1 2) (loop 5 nope)
+    (set g (lambda () (+ n 1))) ((lambda (n +) (g)) 10 -) ((lambda (n) (let (m 1) (g))) 3)
+    """)
+
+def test_deep_recursion():
+    text = "(set sum (lambda (n) (if (= n 0) 0 (+ n (sum (- n 1)))))) (sum 20000)"
+    # Looking names up in a plain Env gets slower with every frame
+    assert evaluate_all(text, evaluate, SlotEnv())[1].value == 200010000
+
+def test_bodies_not_kept():
+    node, = parse("(let (f (lambda (x) (* x 2))) (f 21))")
+    assert evaluate(node, make_env()).value == 42
+    body = weakref.ref(node.values[1].values[1].values[2])
+    del node
+    gc.collect()
+    assert body() is None